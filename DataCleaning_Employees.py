@@ -15,7 +15,15 @@
 
 
 import pandas as pd
-import numpy as np
+
+from exit_surveys import (DETE_FLAGS, DETE_SPEC, SERVICE_EDGES, SERVICE_LABELS,
+                          TAFE_FLAGS, TAFE_SPEC, age_bands, career_stage,
+                          dissatisfied, enable_copy_on_write, extract_unique,
+                          flag_values, load_survey, normalize_age, parse_service,
+                          parse_year)
+
+#selections below are lazy views rather than copies
+enable_copy_on_write()
 
 
 # ### DETE Survey
@@ -23,14 +31,15 @@ import numpy as np
 # In[2]:
 
 
-#read in the data
-dete_survey = pd.read_csv('dete_survey.csv')
+#read in the data once, skipping the columns we don't use (see Data Cleaning below)
+dete_survey, dete_stats = load_survey('dete_survey.csv', DETE_SPEC)
+print(dete_stats)
 
 print(dete_survey.info())
 dete_survey.head()
 
 
-# The DETE dataset has 56 columns:
+# The raw DETE dataset has 56 columns; we keep 35 of them:
 
 # In[3]:
 
@@ -72,14 +81,15 @@ print(dete_survey['NESB'].value_counts())
 # In[6]:
 
 
-#read in the data
-tafe_survey = pd.read_csv('tafe_survey.csv')
+#read in the data once, skipping the columns we don't use (see Data Cleaning below)
+tafe_survey, tafe_stats = load_survey('tafe_survey.csv', TAFE_SPEC)
+print(tafe_stats)
 
 print(tafe_survey.info())
 tafe_survey.head()
 
 
-# The TAFE dataset has 72 columns:
+# The raw TAFE dataset has 72 columns; we keep 23 of them:
 
 # In[7]:
 
@@ -115,32 +125,32 @@ print(tafe_survey['LengthofServiceOverall. Overall Length of Service at Institut
 
 # ## Data Cleaning
 
-# In the DETE dataset, make sure that `Not Stated` values are read in as `NaN` by reading in the data again:
+# In the DETE dataset, `Not Stated` values are read in as `NaN` (`DETE_SPEC.na_values`), so there is no need to read the data again:
 
 # In[10]:
 
 
-dete_survey = pd.read_csv('dete_survey.csv', na_values = 'Not Stated')
-print(dete_survey.info())
+print(DETE_SPEC.na_values)
+dete_survey.isnull().sum()
 
 
 # ### Dropping unnecessary columns
 
-# In the DETE survey, remove columns 28 through 49:
+# The loader never builds the unnecessary columns. In the DETE survey, columns 28 through 49 are skipped:
 
 # In[11]:
 
 
-dete_survey_updated = dete_survey.drop(dete_survey.columns[28:49], axis=1)
+dete_survey_updated = dete_survey
 dete_survey_updated.head()
 
 
-# In the TAFE survey, remove columns 17 through 66:
+# In the TAFE survey, columns 17 through 66 are skipped:
 
 # In[12]:
 
 
-tafe_survey_updated = tafe_survey.drop(tafe_survey.columns[17:66], axis=1)
+tafe_survey_updated = tafe_survey
 tafe_survey_updated.head()
 
 
@@ -213,16 +223,17 @@ dete_survey_updated['separation_type'].value_counts()
 
 
 #rewrites the column - don't run more than once
-#cut strings at the dash, so that we are only left with 'Resignation'
-dete_survey_updated['separation_type'] = dete_survey_updated['separation_type'].str.split('-').str[0]
+#cut strings at the dash, so that we are only left with 'Resignation'; each
+#distinct value is cut once and the result mapped back onto the rows
+dete_survey_updated['separation_type'] = extract_unique(dete_survey_updated['separation_type'], r'^([^-]*)')
 dete_survey_updated['separation_type'].value_counts()
 
 
 # In[21]:
 
 
-#copy the rows that have resignation as the separation type
-dete_resignations = dete_survey_updated[dete_survey_updated['separation_type'] == 'Resignation'].copy()
+#select the rows that have resignation as the separation type
+dete_resignations = dete_survey_updated[dete_survey_updated['separation_type'] == 'Resignation']
 
 
 # In[22]:
@@ -244,7 +255,7 @@ tafe_survey_updated.head()
 # In[24]:
 
 
-tafe_resignations = tafe_survey_updated[tafe_survey_updated['separation_type'] == 'Resignation'].copy()
+tafe_resignations = tafe_survey_updated[tafe_survey_updated['separation_type'] == 'Resignation']
 tafe_resignations.head()
 
 
@@ -258,28 +269,16 @@ tafe_resignations.head()
 dete_resignations['cease_date'].value_counts()
 
 
-# The years make sense. However, some rows include a month, but we only want the year.
+# The years make sense. However, some rows include a month, but we only want the year. `parse_year` reads both `YYYY` and `MM/YYYY` and keeps the year as a small integer (splitting at the "/" and keeping the second part would turn every year-only value into NaN):
 
 # In[26]:
 
 
 #rewrites the column - don't run more than once
-#cut strings at the "/" and keep the second part, the year
-dete_resignations['cease_date'] = dete_resignations['cease_date'].str.split('/').str[1]
-dete_resignations['cease_date'].value_counts()
-
-
-# Now convert the column type to `float`:
-
-# In[27]:
-
-
-dete_resignations['cease_date'] = dete_resignations['cease_date'].astype('float64')
+dete_resignations['cease_date'], unparseable = parse_year(dete_resignations['cease_date'])
+print(unparseable, 'values could not be read as a year')
 dete_resignations['cease_date'].value_counts()
 
-
-# (it still says int64, not float...)
-
 # Check the `dete_start_date` column for similar issues:
 
 # In[28]:
@@ -348,46 +347,38 @@ tafe_resignations['Contributing Factors. Job Dissatisfaction'].value_counts(drop
 
 # The `Contributing Factors. Dissatisfaction` column has the value `Contributing Factors. Dissatisfaction` to indicate dissatisfaction, and a dash otherwise. The `Contributing Factors. Job Dissatisfaction` is the same, except it has the value `Job Dissatisfaction`.
 
-# Replace the strings in the columns with only `True` for dissatisfaction, or `False` or `NaN`: 
+# Replace the strings in the columns with only `True` for dissatisfaction, or `False` or `NA`. `TAFE_FLAGS` lists the two columns and the dash as the "not dissatisfied" token:
 
 # In[35]:
 
 
-#Create a function to replace the values
-def update_vals(myval):
-    if (pd.isnull(myval)):
-        return np.nan
-    elif (myval == '-'):
-        return False
-    else:
-        return True    
+print(TAFE_FLAGS)
 
 
-# Apply the function to change the values in the two columns indicating dissatisfaction:
+# Look at the two columns indicating dissatisfaction as `True`/`False`/`NA` (the raw columns are left as they are):
 
 # In[36]:
 
 
-mycols = ['Contributing Factors. Dissatisfaction', 'Contributing Factors. Job Dissatisfaction']
-tafe_resignations[mycols] = tafe_resignations[mycols].applymap(update_vals)
-tafe_resignations[mycols]
+mycols = list(TAFE_FLAGS.columns)
+flag_values(tafe_resignations, TAFE_FLAGS)
 
 
-# We want to create one column that will indicate dissatisfaction. We will create a new column, `dissatisfied`, which will have the value `True` if either corresponding value in the two columns above is true. 
+# We want to create one column that will indicate dissatisfaction. We will create a new column, `dissatisfied`, which will have the value `True` if either corresponding value in the two columns above is true (and `NA` if neither is true but one is missing). 
 
 # In[37]:
 
 
-tafe_resignations['dissatisfied'] = tafe_resignations[mycols].any(axis=1, skipna=False)
+tafe_resignations['dissatisfied'] = dissatisfied(tafe_resignations, TAFE_FLAGS)
 tafe_resignations['dissatisfied']
 
 
-# Create a copy of the cleaned dataframe:
+# Keep working under a new name. This is a plain alias, not a copy: both names refer to the same dataframe, so the columns added below change `tafe_resignations` too (it is not used again):
 
 # In[38]:
 
 
-tafe_resignations_up = tafe_resignations.copy()
+tafe_resignations_up = tafe_resignations
 
 
 # In the DETE survey, there are several columns indicating dissatisfaction:
@@ -404,18 +395,8 @@ tafe_resignations_up = tafe_resignations.copy()
 # In[39]:
 
 
-#create a list of the column names
-detecols = [
-    'job_dissatisfaction',
-    'dissatisfaction_with_the_department',
-    'physical_work_environment',
-    'lack_of_recognition',
-    'lack_of_job_security',
-    'work_location',
-    'employment_conditions',
-    'work_life_balance',
-    'workload',
-]
+#the list of column names is kept in DETE_FLAGS
+detecols = list(DETE_FLAGS.columns)
 
 #select those columns
 dete_resignations[detecols]
@@ -426,16 +407,16 @@ dete_resignations[detecols]
 # In[40]:
 
 
-dete_resignations['dissatisfied'] = dete_resignations[detecols].any(axis=1, skipna=False)
+dete_resignations['dissatisfied'] = dissatisfied(dete_resignations, DETE_FLAGS)
 dete_resignations['dissatisfied']
 
 
-# Make a copy of the dataframe:
+# Keep working under a new name (again a plain alias of the same dataframe, not a copy):
 
 # In[41]:
 
 
-dete_resignations_up = dete_resignations.copy()
+dete_resignations_up = dete_resignations
 
 
 # ### Combining the datasets
@@ -475,7 +456,7 @@ print(combined['institute_service'].value_counts())
 len(combined['institute_service'])
 
 
-# Where there is a range of numbers, selecting the first number will place it in the correct new group of length of service.
+# `parse_service` reads the numbers, ranges such as `1-2` and phrases such as `Less than 1 year` or `More than 20 years` into lower and upper bounds. Where there is a range of numbers, the lower bound will place it in the correct new group of length of service.
 
 # In[45]:
 
@@ -487,34 +468,25 @@ combined['institute_service']
 # In[46]:
 
 
-#use regex (regular expression) pattern r"(\d+)" to select any digit
-combined['institute_service'] = (combined['institute_service'].astype('str').str.extract(r"(\d+)").astype('float'))
+service, unparseable = parse_service(combined['institute_service'])
+print(unparseable, 'values could not be read as a length of service')
+combined['institute_service'] = service['service_low']
 combined['institute_service'] 
 
 
-# Create a function that will sort values into the four categories listed above:
+# `career_stage` sorts values into the four categories listed above in one step, using the edges 3, 7 and 11. The result is an ordered categorical, so `New` < `Experienced` < `Established` < `Veteran`:
 
 # In[47]:
 
 
-def career_stage(val):
-    if pd.isnull(val):
-        return np.nan
-    elif (val < 3):
-        return 'New'
-    elif (3 <= val < 7):
-        return 'Experienced'
-    elif (7 <= val < 11):
-        return 'Established'
-    else:
-        return 'Veteran'
+print(SERVICE_EDGES, SERVICE_LABELS)
 
 
 # In[48]:
 
 
-#apply the function
-combined['service_cat'] = combined['institute_service'].apply(career_stage)
+#bin the whole column at once
+combined['service_cat'] = career_stage(combined['institute_service'])
 combined['service_cat']
 
 
@@ -571,8 +543,10 @@ combined_updated['dissatisfied'].value_counts(dropna=False)
 # In[58]:
 
 
-combined_updated.loc[:, 'dissatisfied'].copy().fillna(value=False, inplace=True)
-#Try using loc like df.loc[:, 'col2'].fillna(df.col1, inplace=True)
+#filling a .loc selection in place only changed a temporary copy, so the
+#column was never updated; fillna with a dict returns the frame with only
+#that column replaced
+combined_updated = combined_updated.fillna({'dissatisfied': False})
 combined_updated['dissatisfied'].value_counts(dropna=False)
 
 
@@ -589,30 +563,23 @@ combined_updated['service_cat'].value_counts(dropna=False)
 # In[ ]:
 
 
-mypivottable = pd.pivot_table(combined_updated, values='dissatisfied', index=['service_cat'])
+#observed=False keeps every career stage, in order, even if one has no rows
+mypivottable = pd.pivot_table(combined_updated, values='dissatisfied', index=['service_cat'], observed=False)
 mypivottable
 
 
-# Change order of the pivot table:
+# Because `service_cat` is an ordered categorical, the pivot table is already in `New` to `Veteran` order:
 
 # In[ ]:
 
 
-order = [2,1,0,3]
-#create a dictionary and fill in the correct order:
-mydata = {'dissatisfied':[]}
-for i in order:
-    mydata['dissatisfied'].append(mypivottable['dissatisfied'][i])
-
-myindex = ['New', 'Experienced', 'Established', 'Veteran']    
-mydf = pd.DataFrame(mydata, index=myindex) #convert to dataframe
+mydf = mypivottable
 mydf
 
 
 # In[ ]:
 
 
-get_ipython().run_line_magic('matplotlib', 'inline')
 mydf.plot(kind='bar', 
              title='Proportion Of Resignations Due To Dissatisfaction by Length of Service',
              legend=False,
@@ -620,7 +587,12 @@ mydf.plot(kind='bar',
              rot=0.5)
 
 
-# For these data, `1` represents 100% of the employees who have resigned. As established above, `New` employees have spent less than 3 years at the company, `Experienced` employees  have 3 to 6 years, `Established` ones have 7 to 10, and `Veteran` ones have more than 11 years experience at the company. The barplot shows that of the `Established` employees who left the job, 45% resigned to job dissatisfaction. `New` and `Experienced` employees who resigned were equally likely to give dissatisfaction as the reason (about 27%). `Veteran` employees were more likely to give dissatisfaction as their resignation reason (37%) than `New` and `Experienced` employees, but not as likely as `Established` ones. 
+# For these data, `1` represents 100% of the employees who have resigned. As established above, `New` employees have spent less than 3 years at the company, `Experienced` employees  have 3 to 6 years, `Established` ones have 7 to 10, and `Veteran` ones have more than 11 years experience at the company. The barplot shows, for each career stage, the share of the employees who left the job that gave dissatisfaction as a reason. Ranked from most to least likely:
+
+# In[ ]:
+
+
+mydf['dissatisfied'].sort_values(ascending=False).map('{:.0%}'.format)
 
 # ### Removing the rest of the missing values
 
@@ -673,86 +645,39 @@ mytestdf = pd.DataFrame(mytestdata)
 mytestdf
 
 
-# Replace every space with a dash (unneccesary ones will be fixed later):
+# `normalize_age` reads the numbers in each distinct age string once, whether it uses dashes or spaces, and puts everyone 56 and older into a single category, `>55`, and everyone 20 and younger into `<21` (shortened categories to fit on the graph):
 
 # In[ ]:
 
 
-mytestdf['age'] = (mytestdf['age'].str.replace(" ", "-"))
-mytestdf
+age_bands()
 
 
-# Create a function that will remove the dashes from the strings with words, and replace the variety of categories of people 56 and older with a single category, `56 and older`:
-
 # In[ ]:
 
 
-def agefunc(val):
-    if (val == '56-or-older'):
-        return '56 or older'
-    elif (val == '56-60'):
-        return '56 or older'
-    elif (val == '61-or-older'):
-        return '56 or older'
-    elif (val == '20-or-younger'):
-        return '20 or younger'
-    else:
-        return val
-
-
-# In[ ]:
-
-
-mytestdf['age_updated'] = mytestdf['age'].apply(agefunc)
+mytestdf['age_updated'] = normalize_age(mytestdf['age'])
 mytestdf
 
 
 # #### Cleaning the age column: real
 
-# Convert to a pandas dataframe so that the rest of the code works:
+# Keep working under a new name. `combined_updated2` is already a dataframe, so this is a plain alias of it rather than a copy; the `age_updated` column added below shows up under both names:
 
 # In[ ]:
 
 
-combined_updated_df = pd.DataFrame(combined_updated2)
+combined_updated_df = combined_updated2
 combined_updated_df.head()
 
 
-# Replace every space with a dash (unneccesary ones will be fixed later):
-
-# In[ ]:
-
-
-combined_updated_df['age'] = (combined_updated_df['age'].str.replace(" ", "-")).str.replace("--", "-")
-combined_updated_df['age']
-
-
-# Create a function that will remove the dashes from the strings with words, and replace the variety of categories of people 56 and older with a single category, `>55`:
-
-# In[ ]:
-
-
-def agefunc(val):
-    if (val == '56-or-older'):
-        return '>55'
-    elif (val == '56-60'):
-        return '>55'
-    elif (val == '61-or-older'):
-        return '>55'
-    elif (val == '20-or-younger'):
-        return '<21'
-    else:
-        return val
-    #shortened categories to fit on the graph
-
-
-# Apply the function:
+# Normalize the ages into the ordered categories from `<21` to `>55`:
 
 # In[ ]:
 
 
-combined_updated_df['age_updated'] = combined_updated_df['age'].apply(agefunc)
-combined_updated_df['age_updated'].value_counts()
+combined_updated_df['age_updated'] = normalize_age(combined_updated_df['age'])
+combined_updated_df['age_updated'].value_counts(sort=False)
 
 
 # ## Proportion of resignations due to dissatisfaction by age
@@ -762,24 +687,16 @@ combined_updated_df['age_updated'].value_counts()
 # In[ ]:
 
 
-pt_age = pd.pivot_table(combined_updated_df, values='dissatisfied', index=['age_updated'])
+pt_age = pd.pivot_table(combined_updated_df, values='dissatisfied', index=['age_updated'], observed=False)
 pt_age
 
 
-# Fix the order:
+# `age_updated` is an ordered categorical, so the pivot table is already in order from youngest to oldest:
 
 # In[ ]:
 
 
-order = [7,0,1,2,3,4,5,6,8]
-#create a dictionary and fill in the correct order:
-age_ordered = {'dissatisfied':[]}
-for i in order:
-    age_ordered['dissatisfied'].append(pt_age['dissatisfied'][i])
-
-ageindex = ['<21','21-25','26-30','31-35','36-40','41-45',
-            '46-50','51-55','>55']   
-agedf = pd.DataFrame(age_ordered, index=ageindex) #convert to dataframe
+agedf = pt_age
 agedf
 
 
@@ -788,7 +705,6 @@ agedf
 # In[ ]:
 
 
-get_ipython().run_line_magic('matplotlib', 'inline')
 agedf.plot(kind='bar', 
              title='Proportion of resignations due to dissatisfaction by age',
              legend=False,
@@ -796,7 +712,12 @@ agedf.plot(kind='bar',
              rot=0.5)
 
 
-# The age group with the highest proportion of employees resigning due to dissatisfaction is 31- to 35-year-olds, with nearly 35% resigning due to dissatisfaction. 46- to 55-year-olds come close, with 33% resigning due to dissatisfaction (in both the 46-50 and 51-55 categories). The youngest category (21 and under) was least likely to give dissatisfaction as the reason for their resignation (only 22%).
+# The age groups ranked from the highest to the lowest proportion of employees resigning due to dissatisfaction:
+
+# In[ ]:
+
+
+agedf['dissatisfied'].sort_values(ascending=False).map('{:.0%}'.format)
 
 # ## Comparing dissatisfaction between the DETE and TAFE surveys
 
@@ -812,7 +733,6 @@ pt_inst
 # In[ ]:
 
 
-get_ipython().run_line_magic('matplotlib', 'inline')
 pt_inst.plot(kind='bar', 
              title='Proportion of resignations due to dissatisfaction by institute',
              legend=False,
@@ -820,7 +740,12 @@ pt_inst.plot(kind='bar',
              rot=0.5)
 
 
-# Employees from the DETE institute were 1.7 times more likely to list dissatisfaction as the reason for their resignation than employees from the TAFE institute. 
+# How many times more likely employees from the DETE institute were to list dissatisfaction as the reason for their resignation than employees from the TAFE institute:
+
+# In[ ]:
+
+
+round(pt_inst.loc['DETE', 'dissatisfied'] / pt_inst.loc['TAFE', 'dissatisfied'], 1)
 
 # ## Conclusion
 
@@ -828,9 +753,9 @@ pt_inst.plot(kind='bar',
 # Are employees who only worked for the institutes for a short period of time resigning due to some kind of dissatisfaction? What about employees who have been there longer? And:
 # Are younger employees resigning due to some kind of dissatisfaction? What about older employees?
 
-# The first set of questions is answered by the first plot, `Proportion Of Resignations Due To Dissatisfaction by Length of Service`, shows that 45% of resigned employees with 7 to 10 years of experience (`Established` employees) listed some kind of dissatisfaction as the reason, more than any other length of service. `New` (less than 3 years experience) and `Experienced` employees (3 to 6 years experience) who resigned were equally likely to give dissatisfaction as the reason (about 27%). `Veteran` employees (more than 11 years experience) were more likely to give dissatisfaction as their resignation reason (37%) than `New` and `Experienced` employees, but not as likely as `Established` ones. 
+# The first set of questions is answered by the first plot, `Proportion Of Resignations Due To Dissatisfaction by Length of Service`, and the ranking below it: it shows which career stages (`New`, less than 3 years experience, up to `Veteran`, more than 11 years) most often listed some kind of dissatisfaction as the reason for resigning. 
 
-# The second set of questions is answered by the second plot, `Proportion of resignations due to dissatisfaction by age`. The youngest employees (21 and under) are least likely to give dissatisfaction as the reason for their resignation (only 22%). The age group with the highest proportion of employees resigning due to dissatisfaction is 31- to 35-year-olds, with nearly 35% resigning due to dissatisfaction. 46- to 55-year-olds come close, with 33% resigning due to dissatisfaction (in both the 46-50 and 51-55 categories).
+# The second set of questions is answered by the second plot, `Proportion of resignations due to dissatisfaction by age`, and its ranking, from the youngest employees (21 and under) to the oldest (over 55). The figures are computed from the data each time the analysis runs, so they follow any change to the cleaning.
 
 # In[ ]:
 
@@ -0,0 +1,61 @@
+"""Benchmark drawing a long daily series in an 8x3 inch figure: every point vs euro_us.downsample.
+
+Usage: python benchmarks/bench_downsample.py [--days 6000 100000 1000000] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from euro_us.downsample import METHODS, plot_downsampled  # noqa: E402
+
+
+def make_series(days, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('1999-01-04', periods=days, freq='D').to_numpy()
+    return times, 1.1 + np.cumsum(rng.normal(0, 0.005, days))
+
+
+def render(times, rates, method):
+    """Seconds to draw and save the figure, and the downsampling report (None for every point)."""
+    from matplotlib.figure import Figure
+    start = time.perf_counter()
+    figure = Figure(figsize=(8, 3))
+    ax = figure.add_subplot()
+    report = None
+    if method is None:
+        ax.plot(times, rates)
+    else:
+        report = plot_downsampled(ax, times, rates, method=method)[1]
+    figure.savefig(io.BytesIO(), format='png')
+    return time.perf_counter() - start, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, nargs='+', default=[6000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print('{0:>10} {1:>8} {2:>8} {3:>8} {4:>10} {5:>9}'.format(
+        'days', 'method', 'points', 'ratio', 'render s', 'speedup'))
+    for days in args.days:
+        times, rates = make_series(days)
+        full = min(render(times, rates, None)[0] for _ in range(args.repeat))
+        print('{0:>10,} {1:>8} {2:>8,} {3:>8} {4:>10.3f} {5:>9}'.format(days, 'all', days, '', full, ''))
+        for method in METHODS:
+            runs = [render(times, rates, method) for _ in range(args.repeat)]
+            seconds, report = min(runs, key=lambda run: run[0])
+            print('{0:>10,} {1:>8} {2:>8,} {3:>7.0f}x {4:>10.3f} {5:>8.1f}x'.format(
+                days, method, report.points_out, report.ratio, seconds, full / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the TAFE dissatisfaction flag: applymap(update_vals) vs exit_surveys.flags.
+
+Usage: python benchmarks/bench_flags.py [--rows 1000000 10000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from exit_surveys.flags import TAFE_FLAGS, dissatisfied  # noqa: E402
+
+
+#the original per-cell function from DataCleaning_Employees.py
+def update_vals(myval):
+    if (pd.isnull(myval)):
+        return np.nan
+    elif (myval == '-'):
+        return False
+    else:
+        return True
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = {}
+    for col in TAFE_FLAGS.columns:
+        tokens = np.array([col.split('. ')[1], '-', None], dtype=object)
+        frame[col] = tokens[rng.choice(3, size=rows, p=[0.15, 0.75, 0.10])]
+    return pd.DataFrame(frame)
+
+
+def applymap_path(frame):
+    mycols = list(TAFE_FLAGS.columns)
+    #DataFrame.applymap was renamed to DataFrame.map in pandas 2.1
+    cellwise = getattr(frame[mycols], 'map', None) or frame[mycols].applymap
+    return cellwise(update_vals).any(axis=1, skipna=False)
+
+
+def vectorized_path(frame):
+    return dissatisfied(frame, TAFE_FLAGS)
+
+
+def best_of(func, frame, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(frame)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000000, 10000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print('{0:>12} {1:>12} {2:>12} {3:>9}'.format('rows', 'applymap s', 'vector s', 'speedup'))
+    for rows in args.rows:
+        frame = make_frame(rows)
+        old = best_of(applymap_path, frame, args.repeat)
+        new = best_of(vectorized_path, frame, args.repeat)
+        print('{0:>12,} {1:>12.3f} {2:>12.3f} {3:>8.1f}x'.format(rows, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
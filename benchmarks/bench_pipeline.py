@@ -0,0 +1,157 @@
+"""Scaling benchmark for the exit-survey pipeline on synthetic surveys.
+
+Every size runs in its own subprocess so that peak RSS is measured per
+size. Each run times the whole pipeline and every stage (via StageLog) and
+reports rows per second. Sizes above --stream-above run through
+streaming.stream_counts instead, which holds one chunk at a time rather
+than the whole frame; they are timed as one 'stream' stage.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--rows 10000 1000000 10000000]
+        [--data-dir DIR] [--processes N] [--stream-above ROWS] [--save-baseline]
+        [--baseline FILE]
+
+Without --save-baseline the results are compared against the baseline file
+(if it exists); with it they replace it. The baseline records the machine
+it was measured on; baselines/pipeline.json is a reference from a small
+cloud VM (one CPU, 5 GB of memory), so save your own before comparing
+changes on another machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from exit_surveys.instrument import StageLog  # noqa: E402
+from exit_surveys.pipeline import pivots, pivots_from_counts, run  # noqa: E402
+from exit_surveys.streaming import stream_counts  # noqa: E402
+from exit_surveys.synthetic import write_surveys  # noqa: E402
+
+DEFAULT_ROWS = [10000, 1000000, 10000000]
+#larger sizes do not fit in memory on small machines, so they are streamed
+DEFAULT_STREAM_ABOVE = 5000000
+DEFAULT_DATA_DIR = os.path.join(HERE, 'data')
+DEFAULT_BASELINE = os.path.join(HERE, 'baselines', 'pipeline.json')
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_one(rows, data_dir, processes=1, streaming=False):
+    """Benchmark one size in this process; return the result as a dict."""
+    paths = write_surveys(os.path.join(data_dir, str(rows)), rows)
+    input_rows = 2 * rows
+    log = StageLog()
+    start = time.perf_counter()
+    if streaming:
+        with log.stage('stream', input_rows) as stage:
+            counts, _ = stream_counts(paths)
+            stage['rows_out'] = int(counts['rows'].sum())
+        pivots_from_counts(counts)
+    else:
+        pivots(run(paths['DETE'], paths['TAFE'], processes, log=log), log)
+    seconds = time.perf_counter() - start
+    stages = {}
+    for record in log.records:
+        stage = stages.setdefault(record['stage'], {'seconds': 0.0, 'rows_in': 0})
+        stage['seconds'] += record['wall_s']
+        stage['rows_in'] += record['rows_in'] or record['rows_out'] or 0
+    for stage in stages.values():
+        stage['rows_per_s'] = stage['rows_in'] / stage['seconds'] if stage['seconds'] else None
+    return {
+        'rows': rows,
+        'mode': 'streaming' if streaming else 'in memory',
+        'seconds': seconds,
+        'rows_per_s': input_rows / seconds,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages': stages,
+    }
+
+
+def machine():
+    import numpy
+    import pandas
+    return {'platform': platform.platform(), 'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(), 'python': platform.python_version(),
+            'pandas': pandas.__version__, 'numpy': numpy.__version__}
+
+
+def run_isolated(rows, data_dir, processes=1, streaming=False):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--one', str(rows), '--data-dir', data_dir,
+         '--processes', str(processes)] + (['--streaming'] if streaming else []),
+        check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return json.loads(output)
+
+
+def print_result(result, baseline=None):
+    def versus(value, old, what):
+        return '' if not old else '  ({0} {1:+.0%} vs baseline)'.format(what, value / old - 1)
+
+    old = baseline or {}
+    print('{0:,} rows per survey ({6}): {1:.2f} s, {2:,.0f} rows/s{3}, peak RSS {4:,.0f} MB{5}'.format(
+        result['rows'], result['seconds'], result['rows_per_s'],
+        versus(result['rows_per_s'], old.get('rows_per_s'), 'throughput'),
+        result['peak_rss_bytes'] / 2 ** 20,
+        versus(result['peak_rss_bytes'], old.get('peak_rss_bytes'), 'RSS'),
+        result.get('mode', 'in memory')))
+    for name, stage in result['stages'].items():
+        old_stage = old.get('stages', {}).get(name, {})
+        print('    {0:<22} {1:>9.3f} s {2:>16} rows/s{3}'.format(
+            name, stage['seconds'],
+            '{0:,.0f}'.format(stage['rows_per_s']) if stage['rows_per_s'] else '-',
+            versus(stage['seconds'], old_stage.get('seconds'), 'time')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help='where generated surveys are kept between runs')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='clean the sources in this many processes')
+    parser.add_argument('--stream-above', type=int, default=DEFAULT_STREAM_ABOVE,
+                        help='stream sizes above this many rows per survey')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--one', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--streaming', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.one is not None:
+        print(json.dumps(run_one(args.one, args.data_dir, args.processes, args.streaming)))
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline and not args.save_baseline:
+        print('baseline measured on', json.dumps(baseline.get('machine', 'an unrecorded machine')))
+    results = {}
+    for rows in args.rows:
+        results[str(rows)] = result = run_isolated(rows, args.data_dir, args.processes,
+                                                   rows > args.stream_above)
+        print_result(result, None if args.save_baseline else baseline.get(str(rows)))
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        baseline.update(results)
+        baseline['machine'] = machine()
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=1)
+        print('baseline saved to', args.baseline)
+
+
+if __name__ == '__main__':
+    main()
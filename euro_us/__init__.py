@@ -0,0 +1,7 @@
+"""Reusable pieces of the euro-dollar analysis in DataVisualization_EuroUS_plots.ipynb."""
+
+from euro_us.downsample import DownsampleReport, downsample_series, lttb, minmax, plot_downsampled
+from euro_us.rolling import RateSeries, RollingWindow
+
+__all__ = ['DownsampleReport', 'RateSeries', 'RollingWindow', 'downsample_series', 'lttb', 'minmax',
+           'plot_downsampled']
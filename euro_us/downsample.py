@@ -0,0 +1,127 @@
+"""Downsampling of long series to about the pixel width of the plot they are drawn in.
+
+A line drawn in a few hundred pixels cannot show more than a few hundred
+points, but matplotlib still has to transform and path every one of them.
+``lttb`` (largest triangle three buckets) keeps, from each bucket of
+consecutive points, the one forming the largest triangle with its
+neighbours, which preserves the shape and the peaks of the line.
+``minmax`` keeps the lowest and highest point of each bucket, so no
+extreme is ever lost. Both return positions into the input, so the
+original ``x`` values (dates, for example) are plotted unchanged.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+
+@dataclass(frozen=True)
+class DownsampleReport:
+    points_in: int
+    points_out: int
+    seconds: float
+
+    @property
+    def ratio(self):
+        """How many input points each plotted point stands for."""
+        return self.points_in / self.points_out if self.points_out else float('nan')
+
+
+def _numeric(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64) or np.issubdtype(values.dtype, np.timedelta64):
+        values = values.view('int64')
+    return values.astype('float64')
+
+
+def lttb(x, y, points):
+    """Positions of the ``points`` points of (``x``, ``y``) that largest-triangle-three-buckets keeps.
+
+    The first and last points are always kept. NaN values of ``y`` must be
+    dropped first.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x, y = _numeric(x), _numeric(y)
+    #bucket i covers edges[i]:edges[i + 1]; the first and last points are their own buckets
+    edges = np.floor(np.linspace(1, n - 1, points - 1)).astype('int64')
+    kept = np.empty(points, dtype='int64')
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            following = slice(edges[i + 1], edges[i + 2])
+            cx, cy = x[following].mean(), y[following].mean()
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax(x, y, points):
+    """Positions of the lowest and highest point in each of ``points // 2`` buckets, in order.
+
+    The first and last points are always kept. NaN values of ``y`` must be
+    dropped first.
+    """
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    y = _numeric(y)
+    #equal buckets as the rows of a padded (buckets, size) array
+    size = -(-n // max(1, points // 2))
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.inf)
+    padded[:n] = y
+    low = padded.reshape(buckets, size).argmin(axis=1)
+    padded[n:] = -np.inf
+    high = padded.reshape(buckets, size).argmax(axis=1)
+    offsets = np.arange(buckets) * size
+    kept = np.concatenate([[0], offsets + low, offsets + high, [n - 1]])
+    return np.unique(kept)
+
+
+def downsample_series(x, y, points, method='lttb'):
+    """``(x, y, report)`` with (``x``, ``y``) reduced to about ``points`` points by ``method``.
+
+    Points where ``y`` is NaN (the start of a rolling mean, for example)
+    are dropped.
+    """
+    if method not in METHODS:
+        raise ValueError('unknown method {0!r}; use one of {1}'.format(method, ', '.join(METHODS)))
+    started = time.perf_counter()
+    x, y = np.asarray(x), np.asarray(y)
+    present = ~np.isnan(_numeric(y))
+    if not present.all():
+        x, y = x[present], y[present]
+    kept = (lttb if method == 'lttb' else minmax)(x, y, points)
+    report = DownsampleReport(len(present), len(kept), time.perf_counter() - started)
+    return x[kept], y[kept], report
+
+
+def pixel_width(ax):
+    """Width of ``ax`` in pixels at its figure's resolution."""
+    return int(ax.get_window_extent().width)
+
+
+def plot_downsampled(ax, x, y, points=None, method='lttb', **style):
+    """Draw (``x``, ``y``) on ``ax`` reduced to ``points`` points, by default one per pixel.
+
+    Returns ``(lines, report)``; ``report.seconds`` covers the reduction
+    and the ``plot`` call.
+    """
+    started = time.perf_counter()
+    if points is None:
+        points = pixel_width(ax)
+    x, y, report = downsample_series(x, y, points, method)
+    lines = ax.plot(x, y, **style)
+    return lines, DownsampleReport(report.points_in, report.points_out,
+                                   time.perf_counter() - started)
@@ -0,0 +1,200 @@
+"""Rolling exchange-rate statistics that update in O(1) per new day.
+
+``RollingWindow`` keeps the last ``window`` rates with a running sum for
+the mean and two monotonic deques for the minimum and maximum, so pushing
+a rate costs amortised constant time whatever the length of the history.
+``RateSeries`` stores the daily rates and their rolling statistics in
+arrays ordered by time, grown by doubling, so appending a day is O(1) and
+a date range is found by binary search on the times instead of comparing
+every row. A series can be saved and loaded, so each run only appends the
+days it has not seen.
+"""
+
+import json
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ('rolling_mean', 'rolling_min', 'rolling_max')
+
+
+class RollingWindow:
+    """Mean, minimum and maximum of the last ``window`` values pushed.
+
+    Like ``Series.rolling(window)``, the statistics are NaN until
+    ``window`` values have been pushed and while any of them is NaN.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        #(position, value), values increasing from the left for the minimum,
+        #decreasing for the maximum; the front is the answer
+        self._low = deque()
+        self._high = deque()
+        self._sum = 0.0
+        self._missing = 0
+        self._pushed = 0
+
+    def push(self, value):
+        """Add ``value`` as the newest and return ``(mean, min, max)``."""
+        position = self._pushed
+        self._pushed += 1
+        self.values.append(value)
+        if math.isnan(value):
+            self._missing += 1
+        else:
+            self._sum += value
+            while self._low and self._low[-1][1] >= value:
+                self._low.pop()
+            self._low.append((position, value))
+            while self._high and self._high[-1][1] <= value:
+                self._high.pop()
+            self._high.append((position, value))
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self._missing -= 1
+            else:
+                self._sum -= old
+        start = position - self.window + 1
+        while self._low and self._low[0][0] < start:
+            self._low.popleft()
+        while self._high and self._high[0][0] < start:
+            self._high.popleft()
+        if self._pushed % self.window == 0:
+            #re-add the window once per ``window`` pushes so rounding does not drift
+            self._sum = math.fsum(v for v in self.values if not math.isnan(v))
+        return self.current()
+
+    def current(self):
+        if len(self.values) < self.window or self._missing:
+            return (math.nan, math.nan, math.nan)
+        return (self._sum / self.window, self._low[0][1], self._high[0][1])
+
+
+class RateSeries:
+    """Daily rates in time order, with their rolling statistics over ``window`` days.
+
+    ``time`` and ``rate`` name the columns of the frames it returns.
+    """
+
+    def __init__(self, window=30, time='Time', rate='US_dollar'):
+        self.window = window
+        self.time = time
+        self.rate = rate
+        self._size = 0
+        self._times = np.empty(0, dtype='datetime64[ns]')
+        self._columns = {name: np.empty(0) for name in (rate,) + STATISTICS}
+        self._rolling = RollingWindow(window)
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._times):
+            return
+        capacity = max(needed, 2 * len(self._times), 1024)
+        times = np.empty(capacity, dtype='datetime64[ns]')
+        times[:self._size] = self._times[:self._size]
+        self._times = times
+        for name, values in self._columns.items():
+            grown = np.empty(capacity)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+
+    def _check_order(self, first):
+        if self._size and first <= self._times[self._size - 1]:
+            raise ValueError('rates must be added in time order, after {0}'.format(
+                pd.Timestamp(self._times[self._size - 1]).date()))
+
+    def append(self, time, rate):
+        """Add the rate of one day later than every day already held."""
+        time = np.datetime64(pd.Timestamp(time), 'ns')
+        self._check_order(time)
+        self._reserve(1)
+        i = self._size
+        self._times[i] = time
+        self._columns[self.rate][i] = rate
+        for name, value in zip(STATISTICS, self._rolling.push(float(rate))):
+            self._columns[name][i] = value
+        self._size += 1
+
+    def extend(self, times, rates):
+        """Add many days at once; ``times`` must be increasing and after every day held."""
+        times = pd.to_datetime(pd.Series(times)).to_numpy(dtype='datetime64[ns]')
+        rates = np.asarray(rates, dtype='float64')
+        if len(times) == 0:
+            return
+        if (np.diff(times) <= np.timedelta64(0)).any():
+            raise ValueError('times must be strictly increasing')
+        self._check_order(times[0])
+        #the rolling statistics of the new days need the last window - 1 days held
+        held = min(self._size, self.window - 1)
+        tail = np.concatenate([self._columns[self.rate][self._size - held:self._size], rates])
+        rolling = pd.Series(tail).rolling(self.window)
+        self._reserve(len(times))
+        new = slice(self._size, self._size + len(times))
+        self._times[new] = times
+        self._columns[self.rate][new] = rates
+        for name, values in zip(STATISTICS, (rolling.mean(), rolling.min(), rolling.max())):
+            self._columns[name][new] = values.to_numpy()[held:]
+        self._size += len(times)
+        self._refill()
+
+    def _refill(self):
+        """Rebuild the rolling window from the last ``window`` days held."""
+        self._rolling = RollingWindow(self.window)
+        for value in self._columns[self.rate][max(0, self._size - self.window):self._size]:
+            self._rolling.push(float(value))
+
+    @classmethod
+    def from_frame(cls, frame, time='Time', rate='US_dollar', window=30):
+        """A series of the ``time`` and ``rate`` columns of ``frame``, which is sorted by time."""
+        series = cls(window, time, rate)
+        series.extend(frame[time], frame[rate])
+        return series
+
+    def _frame(self, start, stop):
+        columns = {self.time: self._times[start:stop]}
+        columns.update((name, values[start:stop]) for name, values in self._columns.items())
+        return pd.DataFrame(columns, index=pd.RangeIndex(start, stop))
+
+    def frame(self):
+        """Every day held, with columns ``time``, ``rate`` and the rolling statistics."""
+        return self._frame(0, self._size)
+
+    def positions(self, start=None, end=None):
+        """Positions of the first day on or after ``start`` and the first day on or after ``end``."""
+        times = self._times[:self._size]
+        first = 0 if start is None else int(np.searchsorted(
+            times, np.datetime64(pd.Timestamp(start), 'ns'), side='left'))
+        stop = self._size if end is None else int(np.searchsorted(
+            times, np.datetime64(pd.Timestamp(end), 'ns'), side='left'))
+        return first, max(first, stop)
+
+    def between(self, start=None, end=None):
+        """The days from ``start`` (included) to ``end`` (excluded); None leaves a side open."""
+        return self._frame(*self.positions(start, end))
+
+    def save(self, path):
+        """Write the series to one ``.npz`` file at ``path``."""
+        meta = json.dumps({'window': self.window, 'time': self.time, 'rate': self.rate})
+        arrays = {name: values[:self._size] for name, values in self._columns.items()}
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, times=self._times[:self._size].view('int64'),
+                                meta=np.array(meta), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            series = cls(meta['window'], meta['time'], meta['rate'])
+            series._times = data['times'].view('datetime64[ns]')
+            series._columns = {name: data[name] for name in (series.rate,) + STATISTICS}
+        series._size = len(series._times)
+        series._refill()
+        return series
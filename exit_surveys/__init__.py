@@ -0,0 +1,97 @@
+"""Reusable pieces of the DETE/TAFE exit-survey analysis in DataCleaning_Employees.py.
+
+Names are imported from their modules on first use, so that importing the
+package (and ``python -m exit_surveys --help``) does not pay for pandas or
+matplotlib until something needs them.
+"""
+
+import importlib
+
+#public name -> module that defines it
+_EXPORTS = {
+    'age_bands': 'ages',
+    'normalize_age': 'ages',
+    'SERVICE_EDGES': 'binning',
+    'SERVICE_LABELS': 'binning',
+    'bin_values': 'binning',
+    'career_stage': 'binning',
+    'bootstrap_pivots': 'bootstrap',
+    'bootstrap_replicates': 'bootstrap',
+    'confidence_intervals': 'bootstrap',
+    'FrameCache': 'cache',
+    'cached_run': 'cache',
+    'compact_frame': 'compact',
+    'footprint_report': 'compact',
+    'unify_categories': 'compact',
+    'Cube': 'cube',
+    'parse_service': 'dates',
+    'parse_year': 'dates',
+    'DETE_FLAGS': 'flags',
+    'FLAG_SPECS': 'flags',
+    'TAFE_FLAGS': 'flags',
+    'FlagSpec': 'flags',
+    'dissatisfied': 'flags',
+    'flag_values': 'flags',
+    'NULL_LOG': 'instrument',
+    'SamplingProfiler': 'instrument',
+    'StageLog': 'instrument',
+    'DETE_SPEC': 'loader',
+    'TAFE_SPEC': 'loader',
+    'LoadStats': 'loader',
+    'SurveySpec': 'loader',
+    'load_survey': 'loader',
+    'MemoryReport': 'memory',
+    'enable_copy_on_write': 'memory',
+    'profile_memory': 'memory',
+    'COMBINED_COLUMNS': 'pipeline',
+    'clean_dete': 'pipeline',
+    'clean_tafe': 'pipeline',
+    'complete_rows': 'pipeline',
+    'finish': 'pipeline',
+    'group_counts': 'pipeline',
+    'pivots': 'pipeline',
+    'pivots_from_counts': 'pipeline',
+    'run': 'pipeline',
+    'Plan': 'plan',
+    'plan_pivots': 'plan',
+    'survey_plan': 'plan',
+    'PLOT_TITLES': 'plots',
+    'plot_table': 'plots',
+    'RecordStore': 'records',
+    'FigureSpec': 'render',
+    'institute_specs': 'render',
+    'pivot_specs': 'render',
+    'render_figures': 'render',
+    'SOURCES': 'sources',
+    'SourceAdapter': 'sources',
+    'clean_source': 'sources',
+    'ingest': 'sources',
+    'register_source': 'sources',
+    'SurveyDatabase': 'sqlstore',
+    'AggregateStore': 'store',
+    'iter_cleaned': 'streaming',
+    'iter_survey': 'streaming',
+    'stream_counts': 'streaming',
+    'stream_pivots': 'streaming',
+    'clear_memo': 'strings',
+    'extract_unique': 'strings',
+    'map_codes': 'strings',
+    'map_unique': 'strings',
+    'make_dete': 'synthetic',
+    'make_tafe': 'synthetic',
+    'write_surveys': 'synthetic',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    value = getattr(importlib.import_module('exit_surveys.' + _EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,5 @@
+import sys
+
+from exit_surveys.cli import main
+
+sys.exit(main())
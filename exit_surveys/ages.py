@@ -0,0 +1,66 @@
+"""Lookup-table normalizer for the age ranges used by the two surveys.
+
+DETE writes ages as ``'21-25'`` and ``'61 or older'``, TAFE as ``'21  25'``
+and ``'56 or older'``. Only a handful of distinct strings exist, so each one
+is parsed once and the whole column is mapped through integer codes into an
+ordered categorical (via ``strings.map_unique``).
+"""
+
+import re
+
+import pandas as pd
+
+from exit_surveys.strings import map_unique
+
+_NUMBER = re.compile(r'\d+')
+
+
+def age_bands(bottom=21, top=55, width=5):
+    """Return the ordered band labels, e.g. ``['<21', '21-25', ..., '>55']``."""
+    if (top - bottom + 1) % width:
+        raise ValueError('bands of width {0} do not tile {1}-{2}'.format(width, bottom, top))
+    inner = ['{0}-{1}'.format(lo, lo + width - 1) for lo in range(bottom, top, width)]
+    return ['<{0}'.format(bottom)] + inner + ['>{0}'.format(top)]
+
+
+def _parse(raw):
+    """Return the (low, high) bounds of one raw age string; either may be None."""
+    numbers = [int(n) for n in _NUMBER.findall(raw)]
+    text = raw.lower()
+    if len(numbers) == 1 and 'younger' in text:
+        return None, numbers[0]
+    if len(numbers) == 1 and 'older' in text:
+        return numbers[0], None
+    if len(numbers) == 2:
+        return numbers[0], numbers[1]
+    return None, None
+
+
+def _band_code(raw, bands, bottom, top):
+    low, high = _parse(raw)
+    if high is not None and high < bottom:
+        return 0
+    if low is not None and low > top:
+        return len(bands) - 1
+    if low is not None and high is not None:
+        label = '{0}-{1}'.format(low, high)
+        if label in bands:
+            return bands.index(label)
+    #not a band we can represent, e.g. '56 or older' when top=60
+    return -1
+
+
+def normalize_age(values, bottom=21, top=55, width=5):
+    """Map raw age strings to an ordered categorical of ``age_bands(bottom, top, width)``.
+
+    Everything younger than ``bottom`` becomes ``'<bottom'`` and everything
+    older than ``top`` becomes ``'>top'``. Values that cannot be placed in
+    a single band become NaN.
+    """
+    bands = age_bands(bottom, top, width)
+    codes = map_unique(values, lambda raw: _band_code(str(raw), bands, bottom, top),
+                       'int8', missing=-1, key=('age', bottom, top, width))
+    result = pd.Categorical.from_codes(codes.to_numpy(), categories=bands, ordered=True)
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
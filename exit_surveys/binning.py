@@ -0,0 +1,26 @@
+"""Vectorized binning of numeric columns into ordered categoricals."""
+
+import numpy as np
+import pandas as pd
+
+#career stages, modified from the Business Wire article cited in the analysis
+SERVICE_EDGES = (3, 7, 11)
+SERVICE_LABELS = ('New', 'Experienced', 'Established', 'Veteran')
+
+
+def bin_values(values, edges, labels):
+    """Bin ``values`` into ordered ``labels`` split at ``edges``.
+
+    Bins are closed on the left: with edges ``(3, 7)`` the bins are
+    ``< 3``, ``3 <= x < 7`` and ``>= 7``. Missing values stay missing.
+    """
+    if len(labels) != len(edges) + 1:
+        raise ValueError('need {0} labels for {1} edges, got {2}'.format(
+            len(edges) + 1, len(edges), len(labels)))
+    bins = [-np.inf] + list(edges) + [np.inf]
+    return pd.cut(values, bins=bins, labels=list(labels), right=False, ordered=True)
+
+
+def career_stage(values, edges=SERVICE_EDGES, labels=SERVICE_LABELS):
+    """Years of service -> ordered New/Experienced/Established/Veteran."""
+    return bin_values(values, edges, labels)
@@ -0,0 +1,98 @@
+"""Bootstrap confidence intervals for the dissatisfaction proportions.
+
+Resampling the ``n`` responses of a group with replacement and counting
+the dissatisfied ones is a draw from Binomial(n, k / n), so every
+replicate of every group comes from one ``Generator.binomial`` call on a
+(groups, replicates) array instead of resampling rows in a Python loop.
+Replicates are drawn in fixed-size blocks, each seeded by its own child of
+the seed, so the intervals depend only on the seed and not on how many
+processes drew the blocks.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.ages import age_bands
+from exit_surveys.binning import SERVICE_LABELS
+from exit_surveys.pipeline import GROUP_KEYS
+
+DEFAULT_REPLICATES = 10000
+
+#replicates per block; part of what a seed reproduces, so do not change lightly
+BLOCK_REPLICATES = 2500
+
+
+def _draw_block(responses, proportions, replicates, seed):
+    rng = np.random.default_rng(seed)
+    draws = rng.binomial(responses[:, None], proportions[:, None],
+                         size=(len(responses), replicates))
+    return draws / responses[:, None]
+
+
+def bootstrap_replicates(responses, dissatisfied, replicates=DEFAULT_REPLICATES, seed=0,
+                         processes=1):
+    """Bootstrap proportions, shape (groups, replicates), for each group's counts.
+
+    ``responses`` and ``dissatisfied`` are per-group counts; every group
+    needs at least one response. ``processes`` > 1 draws the blocks in a
+    process pool.
+    """
+    responses = np.asarray(responses, dtype='int64')
+    proportions = np.asarray(dissatisfied, dtype='int64') / responses
+    sizes = [BLOCK_REPLICATES] * (replicates // BLOCK_REPLICATES)
+    if replicates % BLOCK_REPLICATES:
+        sizes.append(replicates % BLOCK_REPLICATES)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n = len(sizes)
+    if processes == 1 or n == 1:
+        blocks = list(map(_draw_block, [responses] * n, [proportions] * n, sizes, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            blocks = list(pool.map(_draw_block, [responses] * n, [proportions] * n, sizes, seeds))
+    return np.concatenate(blocks, axis=1)
+
+
+def confidence_intervals(counts, by, replicates=DEFAULT_REPLICATES, confidence=0.95, seed=0,
+                         complete=True, processes=1, labels=None):
+    """Proportion dissatisfied per ``by`` with a percentile bootstrap interval.
+
+    ``counts`` is ``group_counts`` output; with ``complete`` only rows
+    without missing values are counted, as in the age and institute pivots.
+    ``labels`` reindexes the result (groups without responses get NaN).
+    Returns columns ``dissatisfied``, ``low``, ``high`` and ``responses``.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    unknown = set(by) - set(GROUP_KEYS)
+    if unknown:
+        raise KeyError('not a group key: {0}'.format(', '.join(sorted(unknown))))
+    if complete:
+        counts = counts[counts['complete'].astype(bool)]
+    grouped = counts.dropna(subset=by).groupby(by, observed=True)[['dissatisfied', 'responses']].sum()
+    grouped = grouped[grouped['responses'] > 0]
+    samples = bootstrap_replicates(grouped['responses'], grouped['dissatisfied'],
+                                   replicates, seed, processes)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(samples, [tail, 1 - tail], axis=1)
+    table = pd.DataFrame({'dissatisfied': grouped['dissatisfied'] / grouped['responses'],
+                          'low': low, 'high': high, 'responses': grouped['responses']},
+                         index=grouped.index)
+    if labels is not None:
+        table = table.reindex(labels)
+        table.index.name = by[0]
+    return table
+
+
+def bootstrap_pivots(counts, replicates=DEFAULT_REPLICATES, confidence=0.95, seed=0, processes=1):
+    """The service, age and institute pivots of ``pivots_from_counts`` with intervals."""
+    complete = counts[counts['complete'].astype(bool)]
+    options = dict(replicates=replicates, confidence=confidence, seed=seed, processes=processes)
+    return {
+        'service': confidence_intervals(counts, 'service_cat', complete=False,
+                                        labels=list(SERVICE_LABELS), **options),
+        'age': confidence_intervals(counts, 'age_updated', labels=age_bands(), **options),
+        'institute': confidence_intervals(counts, 'institute',
+                                          labels=sorted(complete['institute'].dropna().unique()),
+                                          **options),
+    }
@@ -0,0 +1,238 @@
+"""Content-addressed, columnar cache of the cleaned survey frames.
+
+An entry is keyed by a SHA-256 of the input files plus the cleaning
+configuration, so it is reused only when neither has changed. Each cleaned
+stage is stored as a directory of ``.npy`` files, one per column (text
+columns as integer codes plus their distinct values), which are loaded back
+memory-mapped copy-on-write, so a cached frame can be modified like a
+freshly cleaned one without touching the files. Each source's cleaned rows
+are keyed by that source's file alone, so a changed export only re-cleans
+that source. The cache is trimmed to ``max_bytes`` by evicting the least
+recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.ages import age_bands
+from exit_surveys.binning import SERVICE_EDGES, SERVICE_LABELS
+from exit_surveys.instrument import NULL_LOG
+from exit_surveys.pipeline import finish
+from exit_surveys.sources import SOURCES, clean_files, concat_cleaned
+
+DEFAULT_ROOT = '.exit_survey_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+#bump when the on-disk layout or the meaning of a cleaning step changes
+CACHE_VERSION = 3
+
+#everything that changes the cleaned output besides the input files and the
+#source adapters (see ``adapter_config``)
+CLEANING_CONFIG = (CACHE_VERSION, SERVICE_EDGES, SERVICE_LABELS, tuple(age_bands()))
+
+_MASKED = {'boolean': pd.arrays.BooleanArray}
+
+
+def _masked_type(dtype):
+    name = str(dtype)
+    if name in _MASKED:
+        return _MASKED[name]
+    if name.startswith(('Int', 'UInt')):
+        return pd.arrays.IntegerArray
+    if name.startswith('Float'):
+        return pd.arrays.FloatingArray
+    return None
+
+
+def _save_column(base, name, values):
+    """Write one column to ``base`` + '.npy'; return its metadata."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        np.save(base + '.npy', np.asarray(values.cat.codes))
+        return {'name': name, 'file': base, 'kind': 'category',
+                'categories': values.cat.categories.tolist(), 'ordered': bool(dtype.ordered)}
+    if _masked_type(dtype) is not None:
+        mask = np.asarray(values.isna())
+        data = values.to_numpy(dtype=dtype.numpy_dtype, na_value=0 if dtype.name != 'boolean' else False)
+        np.save(base + '.npy', data)
+        np.save(base + '.mask.npy', mask)
+        return {'name': name, 'file': base, 'kind': 'masked', 'dtype': dtype.name}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufM':
+        np.save(base + '.npy', np.asarray(values))
+        return {'name': name, 'file': base, 'kind': 'numpy'}
+    #text and mixed columns: integer codes plus the distinct values
+    codes, uniques = pd.factorize(values)
+    np.save(base + '.npy', codes)
+    return {'name': name, 'file': base, 'kind': 'factorized',
+            'string': isinstance(dtype, pd.StringDtype), 'dtype': str(dtype),
+            'uniques': [u.item() if hasattr(u, 'item') else u for u in uniques]}
+
+
+def _load_column(meta):
+    data = np.load(meta['file'] + '.npy', mmap_mode='c')
+    kind = meta['kind']
+    if kind == 'numpy':
+        return data
+    if kind == 'category':
+        return pd.Categorical.from_codes(data, categories=meta['categories'],
+                                         ordered=meta['ordered'])
+    if kind == 'masked':
+        mask = np.load(meta['file'] + '.mask.npy', mmap_mode='c')
+        return _masked_type(meta['dtype'])(np.asarray(data), np.asarray(mask))
+    uniques = np.array(meta['uniques'] + [None], dtype=object)
+    #missing values have code -1, which picks the trailing None
+    values = uniques[data]
+    return pd.array(values, dtype=meta['dtype']) if meta['string'] else values
+
+
+def save_frame(directory, frame):
+    """Write ``frame`` column by column under ``directory``."""
+    os.makedirs(directory)
+    columns = [_save_column(os.path.join(directory, 'index'), '__index__',
+                            frame.index.to_series())]
+    for i, name in enumerate(frame.columns):
+        columns.append(_save_column(os.path.join(directory, 'c{0}'.format(i)), name, frame[name]))
+    #store paths relative to the entry so it can be moved
+    for meta in columns:
+        meta['file'] = os.path.basename(meta['file'])
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({'columns': columns}, f)
+
+
+def load_frame(directory):
+    """Read a frame written by ``save_frame``; numeric columns are memory-mapped."""
+    with open(os.path.join(directory, 'meta.json')) as f:
+        columns = json.load(f)['columns']
+    for meta in columns:
+        meta['file'] = os.path.join(directory, meta['file'])
+    index = pd.Index(_load_column(columns[0]))
+    data = {meta['name']: _load_column(meta) for meta in columns[1:]}
+    return pd.DataFrame(data, index=index, columns=[meta['name'] for meta in columns[1:]], copy=False)
+
+
+def _directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+    return total
+
+
+class FrameCache:
+    """Cleaned stages on disk under ``root``, at most ``max_bytes`` in total."""
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _file_digest(self, path):
+        #hashing a multi-GB file costs real time, so remember the digest per
+        #(path, size, mtime) and only rehash when the file has been touched
+        index_path = os.path.join(self.root, 'digests.json')
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        stat = os.stat(path)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        entry = index.get(os.path.abspath(path))
+        if entry and entry['stamp'] == stamp:
+            return entry['sha256']
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        index[os.path.abspath(path)] = {'stamp': stamp, 'sha256': digest.hexdigest()}
+        with open(index_path + '.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(index_path + '.tmp', index_path)
+        return digest.hexdigest()
+
+    def key(self, paths, config=CLEANING_CONFIG):
+        """Hex key for the contents of ``paths`` cleaned under ``config``."""
+        digest = hashlib.sha256(repr(config).encode())
+        for path in paths:
+            digest.update(self._file_digest(path).encode())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key, stage):
+        """The cached ``stage`` frame for ``key``, or None."""
+        directory = os.path.join(self._entry(key), stage)
+        if not os.path.exists(os.path.join(directory, 'meta.json')):
+            return None
+        #the entry's mtime records when it was last used, for eviction
+        os.utime(self._entry(key))
+        return load_frame(directory)
+
+    def put(self, key, stage, frame):
+        directory = os.path.join(self._entry(key), stage)
+        tmp = directory + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        save_frame(tmp, frame)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+        os.utime(self._entry(key))
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        entries = [e for e in os.scandir(self.root) if e.is_dir()]
+        sizes = {e.name: _directory_size(e.path) for e in entries}
+        total = sum(sizes.values())
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total -= sizes[entry.name]
+        return total
+
+
+def _name(func):
+    return '{0}.{1}'.format(func.__module__, func.__qualname__)
+
+
+def adapter_config(adapter):
+    """The parts of ``adapter`` that change its cleaned output, with functions by name."""
+    return (adapter.name, adapter.spec, adapter.flags, sorted(adapter.needed),
+            _name(adapter.rename), _name(adapter.separation), _name(adapter.service),
+            _name(adapter.cease_date))
+
+
+def cached_run(paths, processes=1, log=None, compact=False, cache=None):
+    """``finish(ingest(paths, ...))`` with the cleaned rows of every source cached.
+
+    ``paths`` is {source name: path} for registered sources. The combined
+    rows are cached too, so a run over unchanged files only loads them.
+    """
+    cache = cache or FrameCache()
+    log = log or NULL_LOG
+    config = CLEANING_CONFIG + (compact,)
+    configs = {name: adapter_config(SOURCES[name]) for name in paths}
+    combined_key = cache.key(list(paths.values()), config + tuple(configs.values()))
+    with log.stage('load', source='cache') as stage:
+        combined = cache.get(combined_key, 'combined')
+        stage['rows_out'] = None if combined is None else len(combined)
+    if combined is not None:
+        return combined
+    keys = {name: cache.key([path], config + configs[name]) for name, path in paths.items()}
+    frames = {name: cache.get(keys[name], 'cleaned') for name in paths}
+    missing = {name: paths[name] for name, frame in frames.items() if frame is None}
+    if missing:
+        cleaned = clean_files(missing, processes, None if log is NULL_LOG else log, compact)
+        for name, frame in zip(missing, cleaned):
+            cache.put(keys[name], 'cleaned', frame)
+            frames[name] = frame
+    combined = finish(concat_cleaned(list(frames.values()), log, compact), log)
+    cache.put(combined_key, 'combined', combined)
+    return combined
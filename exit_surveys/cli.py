@@ -0,0 +1,142 @@
+"""Headless batch entry point: ``python -m exit_surveys``.
+
+Runs the cleaning and the three dissatisfaction pivots and writes each pivot
+to ``<out>/<name>.csv`` (or ``.json``); ``--plots`` also saves the charts,
+and ``--institute-plots`` a service and an age chart per institute. Charts
+whose data and style are unchanged since the last run are not redrawn.
+Nothing heavier than argparse is imported until the arguments are parsed,
+and matplotlib only when charts are asked for, so short jobs start fast.
+
+Usage:
+    python -m exit_surveys [--source DETE=dete_survey.csv --source TAFE=tafe_survey.csv]
+        [--out DIR] [--format csv|json] [--plots] [--institute-plots] [--plot-format png]
+        [--compact] [--bootstrap REPLICATES [--seed N]] [--database PATH] [--cache DIR]
+        [--processes N] [--log FILE] [--profile-stage STAGE [--profile-out FILE]]
+"""
+
+import argparse
+import os
+import sys
+
+from exit_surveys.instrument import STAGES
+
+DEFAULT_SOURCES = ['DETE=dete_survey.csv', 'TAFE=tafe_survey.csv']
+
+
+def parse_sources(values):
+    """``['NAME=PATH', ...]`` as an ordered ``{NAME: PATH}`` dict."""
+    paths = {}
+    for value in values:
+        name, sep, path = value.partition('=')
+        if not sep or not name or not path:
+            raise ValueError('expected NAME=PATH, got {0!r}'.format(value))
+        paths[name.upper()] = path
+    return paths
+
+
+def write_tables(tables, directory, fmt='csv'):
+    """Write every pivot in ``tables`` ({name: table}) to ``directory``; return the paths."""
+    paths = []
+    for name, table in tables.items():
+        path = os.path.join(directory, '{0}.{1}'.format(name, fmt))
+        if fmt == 'json':
+            table.to_json(path, orient='index')
+        else:
+            table.to_csv(path)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m exit_surveys', description=__doc__.splitlines()[0])
+    parser.add_argument('--source', action='append', metavar='NAME=PATH',
+                        help='a survey export and its source (repeatable; default: {0})'.format(
+                            ' '.join(DEFAULT_SOURCES)))
+    parser.add_argument('--out', default='.', help='directory for the output files')
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv')
+    parser.add_argument('--plots', action='store_true', help='also save the bar charts')
+    parser.add_argument('--institute-plots', action='store_true',
+                        help='also save service and age charts for each institute')
+    parser.add_argument('--plot-format', default='png')
+    parser.add_argument('--compact', action='store_true',
+                        help='hold the cleaned rows in categoricals and small integers')
+    parser.add_argument('--bootstrap', type=int, metavar='REPLICATES',
+                        help='add bootstrap confidence intervals (low, high) to every pivot')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the bootstrap')
+    parser.add_argument('--database', metavar='PATH',
+                        help='stream the rows into this SQLite database and compute the pivots '
+                             'there, without holding the surveys in memory')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='keep the cleaned rows here and reuse them while the files are unchanged')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='clean the sources and draw the charts in this many processes')
+    parser.add_argument('--log', help='write per-stage JSON lines here ("-" for stdout)')
+    parser.add_argument('--profile-stage', choices=STAGES,
+                        help='sample the call stacks of this stage (top functions go in its log record)')
+    parser.add_argument('--profile-interval', type=float, default=0.005)
+    parser.add_argument('--profile-out', help='write collapsed stacks of the profiled stage here')
+    args = parser.parse_args(argv)
+
+    try:
+        paths = parse_sources(args.source or DEFAULT_SOURCES)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.database and (args.compact or args.bootstrap or args.institute_plots or args.cache):
+        parser.error('--database cannot be combined with --compact, --bootstrap, '
+                     '--institute-plots or --cache')
+    missing = [p for p in paths.values() if not os.path.exists(p)]
+    if missing:
+        parser.error('no such file: {0}'.format(', '.join(missing)))
+
+    #the pipeline (and so pandas) is imported only once the arguments are known good
+    from exit_surveys.instrument import NULL_LOG, StageLog
+    from exit_surveys.pipeline import finish, group_counts, pivots
+    from exit_surveys.sources import SOURCES, ingest
+
+    unknown = [name for name in paths if name not in SOURCES]
+    if unknown:
+        parser.error('unknown source {0}; expected one of {1}'.format(
+            ', '.join(unknown), ', '.join(SOURCES)))
+
+    out = None
+    if args.log:
+        out = sys.stdout if args.log == '-' else open(args.log, 'w')
+    try:
+        log = None
+        if out is not None or args.profile_stage:
+            log = StageLog(out, args.profile_stage, args.profile_interval, args.profile_out)
+        if args.database:
+            from exit_surveys.sqlstore import SurveyDatabase
+            with SurveyDatabase(args.database) as db:
+                db.load_surveys(paths)
+                tables = db.pivots()
+        elif args.cache:
+            from exit_surveys.cache import FrameCache, cached_run
+            combined = cached_run(paths, args.processes, log, args.compact, FrameCache(args.cache))
+            tables = pivots(combined, log or NULL_LOG)
+        else:
+            combined = finish(ingest(paths, args.processes, log, args.compact), log or NULL_LOG)
+            tables = pivots(combined, log or NULL_LOG)
+        if args.bootstrap:
+            from exit_surveys.bootstrap import bootstrap_pivots
+            tables = bootstrap_pivots(group_counts(combined), args.bootstrap,
+                                      seed=args.seed, processes=args.processes)
+        os.makedirs(args.out, exist_ok=True)
+        written = write_tables(tables, args.out, args.format)
+        specs = []
+        if args.plots or args.institute_plots:
+            from exit_surveys.render import institute_specs, pivot_specs, render_figures
+        if args.plots:
+            specs += pivot_specs(tables, args.plot_format)
+        if args.institute_plots:
+            specs += institute_specs(group_counts(combined), args.plot_format)
+        if specs:
+            rendered = render_figures(specs, args.out, args.processes, log=log or NULL_LOG)
+            written += rendered['written']
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    if args.log != '-':
+        for path in written:
+            print(path)
+    return 0
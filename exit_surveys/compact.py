@@ -0,0 +1,94 @@
+"""Opt-in compact dtypes for survey frames, and a memory footprint report.
+
+In compact mode text columns are read as categoricals, and each cleaned
+frame has its low-cardinality text columns as categoricals, yes/no columns
+as nullable booleans and whole-number columns in the smallest integer type
+that holds them. ``footprint_report`` compares the per-column memory of a
+frame before and after.
+"""
+
+import numpy as np
+import pandas as pd
+
+#a text column becomes categorical if it has at most this many distinct
+#values per row
+MAX_CATEGORY_RATIO = 0.5
+
+_INT_TYPES = [('int8', 'Int8'), ('int16', 'Int16'), ('int32', 'Int32')]
+
+
+def _smallest_int(values, masked):
+    low, high = values.min(), values.max()
+    for numpy_name, masked_name in _INT_TYPES:
+        info = np.iinfo(numpy_name)
+        if info.min <= low and high <= info.max:
+            return masked_name if masked else numpy_name
+    return None
+
+
+def compact_column(values, max_ratio=MAX_CATEGORY_RATIO):
+    """``values`` in the most compact dtype that keeps every value."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories()
+    present = values.dropna()
+    if len(present) == 0:
+        return values
+    if dtype == object and present.map(type).eq(bool).all():
+        return values.astype('boolean')
+    if pd.api.types.is_string_dtype(dtype) or dtype == object:
+        if present.nunique() <= max_ratio * len(values):
+            return values.astype('category')
+        return values
+    if pd.api.types.is_bool_dtype(dtype):
+        return values
+    if pd.api.types.is_float_dtype(dtype) and (present == np.floor(present)).all():
+        #floats holding whole numbers (years, for example); NaN needs a masked type
+        target = _smallest_int(present, masked=len(present) < len(values))
+        return values.astype(target) if target else values
+    if pd.api.types.is_integer_dtype(dtype):
+        target = _smallest_int(present, masked=not isinstance(dtype, np.dtype))
+        if target and pd.api.types.pandas_dtype(target).itemsize < dtype.itemsize:
+            return values.astype(target)
+    return values
+
+
+def compact_frame(frame, max_ratio=MAX_CATEGORY_RATIO):
+    """``frame`` with every column passed through ``compact_column``."""
+    return pd.DataFrame({name: compact_column(frame[name], max_ratio) for name in frame.columns},
+                        index=frame.index)
+
+
+def unify_categories(frames):
+    """Give each categorical column the same categories in every frame of ``frames``.
+
+    ``pd.concat`` keeps a categorical column categorical only if its dtype
+    is identical in every frame; otherwise it falls back to object.
+    """
+    frames = list(frames)
+    for name in frames[0].columns:
+        dtypes = [f[name].dtype for f in frames]
+        if len(set(dtypes)) < 2 or not all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            continue
+        categories = dtypes[0].categories
+        for d in dtypes[1:]:
+            categories = categories.append(d.categories[~d.categories.isin(categories)])
+        dtype = pd.CategoricalDtype(categories, ordered=dtypes[0].ordered)
+        frames = [f.assign(**{name: f[name].astype(dtype)}) for f in frames]
+    return frames
+
+
+def footprint(frame):
+    """Bytes held by each column of ``frame``, including the strings themselves."""
+    return frame.memory_usage(index=False, deep=True)
+
+
+def footprint_report(before, after):
+    """Per-column bytes of ``before`` and ``after``, with a total row and the ratio."""
+    report = pd.DataFrame({'before': footprint(before)})
+    report['after'] = footprint(after).reindex(report.index)
+    report.loc['total'] = report.sum()
+    report['ratio'] = report['before'] / report['after']
+    report['dtype_before'] = before.dtypes.astype(str).reindex(report.index)
+    report['dtype_after'] = after.dtypes.astype(str).reindex(report.index)
+    return report
@@ -0,0 +1,90 @@
+"""Parsers for the surveys' mixed-format cease dates and service lengths.
+
+DETE writes cease dates as ``YYYY`` or ``MM/YYYY``; TAFE has plain years
+(read as floats). Service lengths are years as numbers (DETE, cease date
+minus start date) or TAFE strings such as ``'1-2'``, ``'Less than 1 year'``
+and ``'More than 20 years'``. Each parser reads the distinct values only
+(``strings.map_codes``) and returns compact nullable integer columns along
+with the number of non-missing values it could not read.
+"""
+
+import math
+import re
+
+import pandas as pd
+
+from exit_surveys.strings import map_codes
+
+_YEAR = re.compile(r'^\s*(?:(\d{1,2})/)?(\d{4})\s*$')
+_RANGE = re.compile(r'^(\d+)\s*-\s*(\d+)$')
+_LESS_THAN = re.compile(r'^less than (\d+)\b')
+_MORE_THAN = re.compile(r'^more than (\d+)\b')
+
+
+def _year(raw):
+    """The year of ``YYYY``, ``MM/YYYY`` or a whole number; None if it is neither."""
+    if isinstance(raw, str):
+        match = _YEAR.match(raw)
+        if match is None or (match.group(1) and not 1 <= int(match.group(1)) <= 12):
+            return None
+        return int(match.group(2))
+    if float(raw).is_integer() and 1000 <= raw <= 9999:
+        return int(raw)
+    return None
+
+
+def _service(raw):
+    """``(low, high)`` whole years of one service length; ``high`` is None if open."""
+    if not isinstance(raw, str):
+        years = math.floor(raw)
+        return years, years
+    text = ' '.join(raw.lower().split())
+    match = _RANGE.match(text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = _LESS_THAN.match(text)
+    if match:
+        return 0, int(match.group(1)) - 1
+    match = _MORE_THAN.match(text)
+    if match:
+        return int(match.group(1)), None
+    try:
+        years = math.floor(float(text))
+    except ValueError:
+        return None, None
+    return years, years
+
+
+def _take(results, codes, index, name):
+    #missing values have code -1, which picks the trailing None
+    array = pd.array(results + [None], dtype='Int16').take(codes)
+    return pd.Series(array, index=index, name=name)
+
+
+def parse_year(values):
+    """Years of ``values`` (``YYYY``, ``MM/YYYY`` or numbers) as Int16.
+
+    Returns ``(years, unparseable)``; values that are not a year become NA
+    and are counted in ``unparseable``.
+    """
+    codes, years = map_codes(values, _year)
+    index = values.index if isinstance(values, pd.Series) else None
+    result = _take(years, codes, index, getattr(values, 'name', None))
+    return result, int(result.isna().sum() - (codes == -1).sum())
+
+
+def parse_service(values):
+    """Lower and upper bounds, in whole years, of the service lengths in ``values``.
+
+    Returns ``(bounds, unparseable)`` where ``bounds`` has Int16 columns
+    ``service_low`` and ``service_high``. ``'Less than N years'`` is
+    ``0`` to ``N - 1``; ``'More than N years'`` has no upper bound (NA).
+    Values that cannot be read have both bounds NA and are counted in
+    ``unparseable``.
+    """
+    codes, bounds = map_codes(values, _service)
+    index = values.index if isinstance(values, pd.Series) else None
+    low = _take([b[0] for b in bounds], codes, index, 'service_low')
+    high = _take([b[1] for b in bounds], codes, index, 'service_high')
+    unparseable = int(low.isna().sum() - (codes == -1).sum())
+    return pd.DataFrame({'service_low': low, 'service_high': high}), unparseable
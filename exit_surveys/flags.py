@@ -0,0 +1,82 @@
+"""Vectorized dissatisfaction flags.
+
+Each institute lists the columns that can signal dissatisfaction and the
+tokens in those columns that mean "not dissatisfied". A cell is then
+missing, negative, or positive (anything else), and a row is dissatisfied
+when any of its cells is positive. Everything is done with whole-array
+operations instead of one Python call per cell.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FlagSpec:
+    """Where to look for dissatisfaction in one institute's survey."""
+
+    columns: tuple
+    negative: tuple
+
+
+#column names are the cleaned (renamed) ones used after the rename step
+DETE_FLAGS = FlagSpec(
+    columns=(
+        'job_dissatisfaction',
+        'dissatisfaction_with_the_department',
+        'physical_work_environment',
+        'lack_of_recognition',
+        'lack_of_job_security',
+        'work_location',
+        'employment_conditions',
+        'work_life_balance',
+        'workload',
+    ),
+    negative=(False,),
+)
+
+#a dash means the factor was not ticked; the text of the factor means it was
+TAFE_FLAGS = FlagSpec(
+    columns=(
+        'Contributing Factors. Dissatisfaction',
+        'Contributing Factors. Job Dissatisfaction',
+    ),
+    negative=('-',),
+)
+
+FLAG_SPECS = {'DETE': DETE_FLAGS, 'TAFE': TAFE_FLAGS}
+
+
+def _masks(frame, spec):
+    values = frame[list(spec.columns)]
+    missing = values.isna().to_numpy()
+    #a frame mixing bool and nullable boolean columns gives an object array otherwise
+    negative = values.isin(list(spec.negative)).to_numpy(dtype=bool, na_value=False)
+    return missing, ~(missing | negative)
+
+
+def flag_values(frame, spec):
+    """Return the ``spec`` columns of ``frame`` as nullable booleans.
+
+    This is the vectorized equivalent of ``frame[cols].applymap(update_vals)``.
+    """
+    missing, positive = _masks(frame, spec)
+    return pd.DataFrame(
+        {col: pd.arrays.BooleanArray(positive[:, i], missing[:, i])
+         for i, col in enumerate(spec.columns)},
+        index=frame.index,
+    )
+
+
+def dissatisfied(frame, spec):
+    """Return one nullable boolean per row of ``frame``.
+
+    A row is True if any flag column is positive, False if every flag column
+    is negative, and NA otherwise (no positive answer, at least one missing).
+    """
+    missing, positive = _masks(frame, spec)
+    any_positive = positive.any(axis=1)
+    unknown = ~any_positive & missing.any(axis=1)
+    return pd.Series(pd.arrays.BooleanArray(any_positive, unknown),
+                     index=frame.index, name='dissatisfied')
@@ -0,0 +1,148 @@
+"""Per-stage timing and row counts for the exit-survey pipeline.
+
+A ``StageLog`` times named stages (wall and CPU seconds, rows in and out)
+and writes one JSON line per stage. One stage can be sampled by a small
+statistical profiler: a background thread records the stack of the thread
+running that stage every few milliseconds, which is cheap enough to leave
+on in production-sized runs. Stages run in worker processes are recorded by
+a ``child`` log there and merged back into the parent log.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+#the stages of the pipeline, in order
+STAGES = (
+    'load',
+    'drop columns',
+    'rename',
+    'resignation filter',
+    'date fix',
+    'service length',
+    'dissatisfaction flag',
+    'concat',
+    'binning',
+    'pivot',
+    'render',
+)
+
+
+class SamplingProfiler:
+    """Sample the stack of one thread every ``interval`` seconds."""
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append('{0}:{1}'.format(code.co_filename.rsplit('/', 1)[-1], code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def top(self, n=20):
+        """The ``n`` functions most often at the top of the stack."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [{'function': f, 'samples': c} for f, c in leaves.most_common(n)]
+
+
+def write_collapsed(stacks, path):
+    """Write stack samples in the collapsed-stack format read by flame graph tools."""
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write('{0} {1}\n'.format(stack, count))
+
+
+class StageLog:
+    """Collects one record per stage and writes each as a JSON line to ``out``.
+
+    ``profile_stage`` names the stage to run under ``SamplingProfiler``;
+    its top functions are added to that stage's record, and the samples of
+    every run of that stage are written to ``profile_out`` if given.
+    """
+
+    def __init__(self, out=None, profile_stage=None, profile_interval=0.005, profile_out=None):
+        if profile_stage is not None and profile_stage not in STAGES:
+            raise ValueError('unknown stage {0!r}; expected one of {1}'.format(
+                profile_stage, ', '.join(STAGES)))
+        self.out = out
+        self.profile_stage = profile_stage
+        self.profile_interval = profile_interval
+        self.profile_out = profile_out
+        self.profile_stacks = Counter()
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None, **fields):
+        """Time the ``with`` block as ``name``; set ``rows_out`` on the yielded record."""
+        record = dict(stage=name, **fields)
+        record.update(rows_in=rows_in, rows_out=None)
+        profiler = None
+        if name == self.profile_stage:
+            profiler = SamplingProfiler(interval=self.profile_interval).start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall, 6)
+            record['cpu_s'] = round(time.process_time() - cpu, 6)
+            if profiler is not None:
+                profiler.stop()
+                record['profile'] = profiler.top()
+                self.profile_stacks.update(profiler.stacks)
+                if self.profile_out:
+                    write_collapsed(self.profile_stacks, self.profile_out)
+            self.records.append(record)
+            if self.out is not None:
+                self.out.write(json.dumps(record) + '\n')
+                self.out.flush()
+
+    def child(self):
+        """An empty log with the same profiling settings, to send to a worker process."""
+        return StageLog(profile_stage=self.profile_stage, profile_interval=self.profile_interval)
+
+    def merge(self, child):
+        """Add the records and profile samples of a ``child`` log, writing the records to ``out``."""
+        self.profile_stacks.update(child.profile_stacks)
+        if self.profile_out and child.profile_stacks:
+            write_collapsed(self.profile_stacks, self.profile_out)
+        for record in child.records:
+            self.records.append(record)
+            if self.out is not None:
+                self.out.write(json.dumps(record) + '\n')
+        if self.out is not None:
+            self.out.flush()
+
+
+class _NullLog:
+    """Stand-in when no log is wanted; the stages cost nothing."""
+
+    def stage(self, name, rows_in=None, **fields):
+        return nullcontext({})
+
+
+NULL_LOG = _NullLog()
+
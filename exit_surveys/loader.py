@@ -0,0 +1,126 @@
+"""Single-pass, column-pruned reader for the DETE and TAFE exit surveys.
+
+Each survey is described by a ``SurveySpec``: which columns to keep, which
+tokens mean "missing" and which dtypes to parse into. The CSV is read once
+with ``usecols`` so the dropped columns are never converted or stored.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SurveySpec:
+    """What to keep from one raw survey export."""
+
+    name: str
+    #positions of the kept columns in the raw file
+    usecols: tuple
+    #number of columns the raw export is expected to have
+    n_columns: int
+    na_values: tuple = ()
+    dtype: dict = field(default_factory=dict)
+
+
+@dataclass
+class LoadStats:
+    """Work done by one call to ``load_survey``."""
+
+    name: str
+    bytes_read: int
+    rows: int
+    columns_kept: int
+    columns_total: int
+    memory_bytes: int
+
+    def __str__(self):
+        return ('{0}: {1:,} rows, {2}/{3} columns, {4:,} bytes read, '
+                '{5:,} bytes in memory').format(
+                    self.name, self.rows, self.columns_kept,
+                    self.columns_total, self.bytes_read, self.memory_bytes)
+
+
+#DETE: keep everything except columns 28 through 48 (the workplace ratings)
+DETE_SPEC = SurveySpec(
+    name='DETE',
+    usecols=tuple(range(0, 28)) + tuple(range(49, 56)),
+    n_columns=56,
+    na_values=('Not Stated',),
+    #text columns are pinned to str so that a chunk which happens to be all
+    #missing is not inferred as float
+    dtype={'ID': 'int64',
+           'SeparationType': 'str',
+           'Cease Date': 'str',
+           'DETE Start Date': 'float64',
+           'Role Start Date': 'float64',
+           'Position': 'str',
+           'Employment Status': 'str',
+           'Gender': 'str',
+           'Age': 'str'},
+)
+
+#TAFE: keep everything except columns 17 through 65 (the institute views)
+TAFE_SPEC = SurveySpec(
+    name='TAFE',
+    usecols=tuple(range(0, 17)) + tuple(range(66, 72)),
+    n_columns=72,
+    dtype={'Record ID': 'float64',
+           'CESSATION YEAR': 'float64',
+           'Reason for ceasing employment': 'str',
+           'Contributing Factors. Dissatisfaction': 'str',
+           'Contributing Factors. Job Dissatisfaction': 'str',
+           'Gender. What is your Gender?': 'str',
+           'CurrentAge. Current Age': 'str',
+           'Employment Type. Employment Type': 'str',
+           'Classification. Classification': 'str',
+           'LengthofServiceOverall. Overall Length of Service at Institute (in years)': 'str',
+           'LengthofServiceCurrent. Length of Service at current workplace (in years)': 'str'},
+)
+
+
+def read_header(path, spec):
+    """Return the raw column names of ``path``, checking them against ``spec``."""
+    header = list(pd.read_csv(path, nrows=0).columns)
+    if len(header) != spec.n_columns:
+        raise ValueError('{0} survey {1!r} has {2} columns, expected {3}'.format(
+            spec.name, path, len(header), spec.n_columns))
+    return header
+
+
+def read_options(path, spec, compact=False):
+    """Keyword arguments for ``pd.read_csv`` that apply ``spec`` to ``path``.
+
+    With ``compact`` the text columns are read as categoricals.
+    """
+    header = read_header(path, spec)
+    kept = [header[i] for i in spec.usecols]
+    #only pass dtypes for columns we actually keep
+    dtype = {k: v for k, v in spec.dtype.items() if k in kept}
+    if compact:
+        dtype = {k: 'category' if v == 'str' else v for k, v in dtype.items()}
+    return {
+        'usecols': kept,
+        'na_values': list(spec.na_values),
+        'dtype': dtype,
+    }
+
+
+def load_survey(path, spec, compact=False):
+    """Read the survey at ``path`` once, keeping only the columns in ``spec``.
+
+    Returns ``(frame, stats)``; the columns of ``frame`` keep their raw
+    order and names. ``compact`` reads text columns as categoricals.
+    """
+    options = read_options(path, spec, compact)
+    frame = pd.read_csv(path, **options)
+    stats = LoadStats(
+        name=spec.name,
+        bytes_read=os.path.getsize(path),
+        rows=len(frame),
+        columns_kept=len(options['usecols']),
+        columns_total=spec.n_columns,
+        memory_bytes=int(frame.memory_usage(index=True, deep=True).sum()),
+    )
+    return frame, stats
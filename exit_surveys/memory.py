@@ -0,0 +1,96 @@
+"""Copy-on-write setup and per-stage memory accounting.
+
+``track`` wraps one pipeline stage and records, via ``tracemalloc``, how
+many bytes the stage left allocated and its peak allocation. numpy (and so
+pandas) reports its buffers to ``tracemalloc``, so frame data is included.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pandas as pd
+
+from exit_surveys.loader import load_survey
+from exit_surveys.pipeline import finish, pivots
+from exit_surveys.sources import SOURCES, clean_source
+
+
+def enable_copy_on_write():
+    """Turn on pandas copy-on-write, so selections and renames are lazy views.
+
+    Copy-on-write is always on from pandas 3.0; on 2.x it is an option.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    allocated_bytes: int
+    peak_bytes: int
+    seconds: float
+
+
+class MemoryReport:
+    """Memory used by each stage of one run, in the order the stages ran."""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def track(self, stage):
+        """Record the allocations made inside the ``with`` block as ``stage``."""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            self.stages.append(StageMemory(stage, after - before, peak - before,
+                                           time.perf_counter() - start))
+            if started:
+                tracemalloc.stop()
+
+    def __str__(self):
+        lines = ['{0:<22} {1:>14} {2:>14} {3:>9}'.format('stage', 'allocated', 'peak', 'seconds')]
+        for s in self.stages:
+            lines.append('{0:<22} {1:>14,} {2:>14,} {3:>9.3f}'.format(
+                s.stage, s.allocated_bytes, s.peak_bytes, s.seconds))
+        return '\n'.join(lines)
+
+
+def profile_memory(paths):
+    """Run the in-memory pipeline over ``paths`` ({source name: path}) stage by stage.
+
+    Returns ``(pivots, report)``. Tracing is kept on for the whole run so
+    that ``allocated`` of each stage is what it still holds at the end of it.
+    """
+    enable_copy_on_write()
+    report = MemoryReport()
+    tracemalloc.start()
+    try:
+        cleaned = []
+        for name, path in paths.items():
+            adapter = SOURCES[name]
+            with report.track('load ' + name):
+                raw, _ = load_survey(path, adapter.spec)
+            with report.track('clean ' + name):
+                cleaned.append(clean_source(adapter, raw))
+            del raw
+        with report.track('concat'):
+            combined = pd.concat(cleaned, ignore_index=True)
+        del cleaned
+        with report.track('finish'):
+            finish(combined)
+        with report.track('pivots'):
+            result = pivots(combined)
+    finally:
+        tracemalloc.stop()
+    return result, report
@@ -0,0 +1,117 @@
+"""The cleaning steps of DataCleaning_Employees.py as reusable functions.
+
+``clean_dete``/``clean_tafe`` take a raw survey frame (or one chunk of it)
+and return the resignations with the shared columns (``sources`` has the
+per-institute details); ``finish`` derives the service and age categories
+on the combined rows. The dissatisfaction pivots are computed from
+per-group counts so that the same code serves both the in-memory and the
+streaming (chunked) paths.
+"""
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.ages import age_bands, normalize_age
+from exit_surveys.binning import SERVICE_LABELS, career_stage
+from exit_surveys.instrument import NULL_LOG
+from exit_surveys.sources import DETE, TAFE, clean_source, ingest
+
+#the columns kept in combined_updated
+COMBINED_COLUMNS = [
+    'id',
+    'separation_type',
+    'position',
+    'employment_status',
+    'gender',
+    'age',
+    'dissatisfied',
+    'institute',
+    'service_cat',
+]
+
+
+def clean_dete(frame):
+    """Resignations from a raw DETE frame, reduced to ``sources.CLEANED_COLUMNS``."""
+    return clean_source(DETE, frame)
+
+
+def clean_tafe(frame):
+    """Resignations from a raw TAFE frame, reduced to ``sources.CLEANED_COLUMNS``."""
+    return clean_source(TAFE, frame)
+
+
+def finish(combined, log=NULL_LOG):
+    """Add ``service_cat`` and ``age_updated`` to combined cleaned rows.
+
+    Missing ``dissatisfied`` values are filled with False, and the service
+    category is binned from the lower bound of the service length. The
+    columns are set on ``combined`` itself, so only the new columns are
+    allocated.
+    """
+    with log.stage('binning', len(combined)) as stage:
+        combined['dissatisfied'] = combined['dissatisfied'].fillna(False)
+        combined['service_cat'] = career_stage(combined['service_low'])
+        combined['age_updated'] = normalize_age(combined['age'])
+        stage['rows_out'] = len(combined)
+    return combined
+
+
+def run(dete_path='dete_survey.csv', tafe_path='tafe_survey.csv', processes=1, log=None,
+        compact=False):
+    """Load, clean and combine both surveys in memory (in compact dtypes if ``compact``)."""
+    combined = ingest({'DETE': dete_path, 'TAFE': tafe_path}, processes, log, compact)
+    return finish(combined, log or NULL_LOG)
+
+
+#the keys the pivots are built from; 'complete' marks rows with no missing
+#value in COMBINED_COLUMNS, which are the only ones used for age and institute
+GROUP_KEYS = ['institute', 'service_cat', 'age_updated', 'cease_date', 'complete']
+
+
+def complete_rows(combined):
+    """True for the rows of ``combined`` with no missing value in ``COMBINED_COLUMNS``."""
+    return pd.Series(np.logical_and.reduce([combined[c].notna().to_numpy() for c in COMBINED_COLUMNS]),
+                     index=combined.index, name='complete')
+
+
+def group_counts(combined):
+    """Dissatisfied/response/row counts of ``combined`` per ``GROUP_KEYS``."""
+    complete = complete_rows(combined)
+    #group by the columns themselves rather than a widened copy of the frame
+    keys = [combined[k] for k in GROUP_KEYS if k != 'complete'] + [complete]
+    counts = combined.groupby(keys, dropna=False, observed=True).agg(
+        dissatisfied=('dissatisfied', 'sum'),
+        responses=('dissatisfied', 'count'),
+        rows=('dissatisfied', 'size'),
+    ).astype('int64')
+    return counts.reset_index()
+
+
+def _proportions(counts, key, labels):
+    grouped = counts[counts[key].notna()].groupby(key)[['dissatisfied', 'responses']].sum()
+    grouped = grouped.reindex(labels, fill_value=0)
+    table = pd.DataFrame({'dissatisfied': grouped['dissatisfied'] / grouped['responses']})
+    table.index.name = key
+    return table
+
+
+def pivots_from_counts(counts):
+    """The service, age and institute pivots from ``group_counts`` output.
+
+    Missing categories appear as NaN rows rather than being dropped.
+    """
+    complete = counts[counts['complete'].astype(bool)]
+    return {
+        'service': _proportions(counts, 'service_cat', list(SERVICE_LABELS)),
+        'age': _proportions(complete, 'age_updated', age_bands()),
+        'institute': _proportions(complete, 'institute',
+                                  sorted(complete['institute'].dropna().unique())),
+    }
+
+
+def pivots(combined, log=NULL_LOG):
+    """The three dissatisfaction pivots of the analysis for ``combined``."""
+    with log.stage('pivot', len(combined)) as stage:
+        result = pivots_from_counts(group_counts(combined))
+        stage['rows_out'] = sum(len(table) for table in result.values())
+    return result
@@ -0,0 +1,347 @@
+"""Declarative pipeline descriptions and a planner that reorders them.
+
+A ``Plan`` lists the steps of the analysis in the order they are easiest
+to write down: scan a survey, derive columns, filter, select, group.
+``optimize`` rewrites it before anything is read:
+
+- projection pushdown: only the raw columns some later step reads are
+  passed to ``read_csv(usecols=...)``;
+- predicate pushdown: every filter, together with the derives it depends
+  on, runs on each chunk straight after it is read. A derive never
+  overtakes a step that reads or overwrites one of its outputs: such a
+  step moves with it (a select with every step before it);
+- the remaining derives run only on the rows that survive the filters, and
+  derives whose output nothing reads are dropped.
+
+Derives must be row-wise (each output row depends only on the same input
+row), which is what makes moving them across a filter safe. ``explain``
+shows the optimized plan, and ``execute`` runs a plan, optimized or not,
+chunk by chunk. Grouped plans are aggregated per chunk and the partial
+counts added up, so memory is bounded by the chunk size.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Callable
+
+import pandas as pd
+
+from exit_surveys.ages import normalize_age
+from exit_surveys.binning import career_stage
+from exit_surveys.dates import parse_service, parse_year
+from exit_surveys.flags import dissatisfied
+from exit_surveys.loader import read_header, read_options
+from exit_surveys.pipeline import (
+    COMBINED_COLUMNS,
+    GROUP_KEYS,
+    complete_rows,
+    pivots_from_counts,
+)
+from exit_surveys.sources import PASSTHROUGH, SOURCES
+
+#how each aggregation of partial (per-chunk) groups is combined: all by addition
+AGGREGATIONS = ('sum', 'count', 'size')
+
+
+@dataclass(frozen=True)
+class Scan:
+    """Read ``path`` as ``adapter`` describes it.
+
+    The planner fills in ``columns``, the raw columns to read (None: every
+    column the adapter's spec keeps), and ``pushed``, the filters and the
+    derives they need, run on each chunk as it is read.
+    """
+
+    adapter: object
+    path: str
+    columns: tuple = None
+    pushed: tuple = ()
+
+
+@dataclass(frozen=True)
+class Derive:
+    """Set ``outputs`` to ``func(frame)``, which reads only ``inputs``.
+
+    ``func`` returns a Series for a single output, or a frame with the
+    ``outputs`` columns.
+    """
+
+    outputs: tuple
+    func: Callable
+    inputs: tuple
+
+
+@dataclass(frozen=True)
+class Filter:
+    """Keep the rows where ``column`` is one of ``values``."""
+
+    column: str
+    values: tuple
+
+
+@dataclass(frozen=True)
+class Select:
+    columns: tuple
+
+
+@dataclass(frozen=True)
+class Group:
+    """Count per ``keys``; ``aggregations`` maps output name to (column, how)."""
+
+    keys: tuple
+    aggregations: tuple
+
+
+def _describe(step):
+    if isinstance(step, Derive):
+        return 'Derive {0} <- {1}'.format(', '.join(step.outputs), ', '.join(step.inputs) or '(constant)')
+    if isinstance(step, Filter):
+        return 'Filter {0} in {1!r}'.format(step.column, step.values)
+    if isinstance(step, Select):
+        return 'Select {0}'.format(', '.join(step.columns))
+    if isinstance(step, Group):
+        return 'Group by {0}: {1}'.format(', '.join(step.keys), ', '.join(
+            '{0}={1}({2})'.format(name, how, column) for name, (column, how) in step.aggregations))
+    spec = step.adapter.spec
+    if step.columns is None:
+        read = 'all {0} kept columns'.format(len(spec.usecols))
+    else:
+        read = '{0} of {1} columns: {2}'.format(len(step.columns), spec.n_columns,
+                                                 ', '.join(step.columns))
+    return 'Scan {0} {1!r}, reading {2}'.format(step.adapter.name, step.path, read)
+
+
+@dataclass(frozen=True)
+class Plan:
+    steps: tuple
+    #steps removed by ``optimize``, kept for ``explain``
+    pruned: tuple = ()
+    optimized: bool = False
+
+    @classmethod
+    def scan(cls, adapter, path):
+        return cls((Scan(adapter, path),))
+
+    def _then(self, step):
+        if self.optimized:
+            raise ValueError('cannot add steps to an optimized plan')
+        if isinstance(self.steps[-1], Group):
+            raise ValueError('cannot add steps after a group')
+        return replace(self, steps=self.steps + (step,))
+
+    def derive(self, outputs, func, inputs=()):
+        if isinstance(outputs, str):
+            outputs = (outputs,)
+        return self._then(Derive(tuple(outputs), func, tuple(inputs)))
+
+    def filter(self, column, *values):
+        return self._then(Filter(column, values))
+
+    def select(self, *columns):
+        return self._then(Select(columns))
+
+    def group(self, keys, **aggregations):
+        for name, (column, how) in aggregations.items():
+            if how not in AGGREGATIONS:
+                raise ValueError('cannot combine {0!r} across chunks; use one of {1}'.format(
+                    how, ', '.join(AGGREGATIONS)))
+        return self._then(Group(tuple(keys), tuple(aggregations.items())))
+
+    def optimize(self):
+        return optimize(self)
+
+    def explain(self):
+        return explain(self)
+
+    def execute(self, chunksize=None):
+        return execute([self], chunksize)
+
+
+def _reads(step):
+    if isinstance(step, Derive):
+        return set(step.inputs)
+    if isinstance(step, Filter):
+        return {step.column}
+    if isinstance(step, Select):
+        return set(step.columns)
+    if isinstance(step, Group):
+        return set(step.keys) | {column for column, _ in dict(step.aggregations).values()}
+    return set()
+
+
+def _needed_by(steps, needed):
+    """The steps (in order) that produce ``needed``, and the columns they read."""
+    kept = []
+    needed = set(needed)
+    for step in reversed(steps):
+        if isinstance(step, Derive):
+            if needed.isdisjoint(step.outputs):
+                continue
+            needed -= set(step.outputs)
+            needed |= set(step.inputs)
+        elif isinstance(step, (Filter, Select, Group)):
+            needed |= _reads(step)
+        kept.append(step)
+    return kept[::-1], needed
+
+
+def _pushdown(live):
+    """The steps of ``live`` to run on each chunk as it is read, in their order."""
+    position = {id(s): i for i, s in enumerate(live)}
+    pushed = {}
+
+    def push(step):
+        i = position[id(step)]
+        if isinstance(step, Select):
+            #a select drops columns the steps before it may read
+            moved = live[:i + 1]
+        else:
+            earlier = [s for s in live[:i] if isinstance(s, Derive)]
+            moved = _needed_by(earlier, _reads(step))[0] + [step]
+        for s in moved:
+            pushed.setdefault(id(s), s)
+
+    for step in live:
+        if isinstance(step, Filter):
+            push(step)
+    while True:
+        #steps left behind that read, or overwrite, a column a pushed derive writes later on
+        writes = [(position[i], set(s.outputs)) for i, s in pushed.items() if isinstance(s, Derive)]
+        blocking = [s for s in live if id(s) not in pushed and any(
+            later > position[id(s)]
+            and (outputs & _reads(s) or isinstance(s, Derive) and outputs & set(s.outputs))
+            for later, outputs in writes)]
+        if not blocking:
+            return sorted(pushed.values(), key=lambda s: position[id(s)])
+        for s in blocking:
+            push(s)
+
+
+def optimize(plan):
+    """Return ``plan`` with projection and predicate pushdown and dead derives removed."""
+    if plan.optimized:
+        return plan
+    scan, steps = plan.steps[0], list(plan.steps[1:])
+    live = steps
+    if steps and isinstance(steps[-1], (Group, Select)):
+        #only what the final group or select reads is needed
+        live, _ = _needed_by(steps, ())
+    pruned = tuple(s for s in steps if s not in live)
+    #filters, and the derives they depend on, move into the scan
+    pushed = _pushdown(live)
+    rest = [s for s in live if all(s is not p for p in pushed)]
+    columns = None
+    if live is not steps:
+        #the raw columns read are whatever a step reads before any derive produces it
+        raw, produced = set(), set()
+        for step in pushed + rest:
+            raw |= _reads(step) - produced
+            if isinstance(step, Derive):
+                produced |= set(step.outputs)
+        kept = [read_header(scan.path, scan.adapter.spec)[i] for i in scan.adapter.spec.usecols]
+        columns = tuple(c for c in kept if scan.adapter.rename(c) in raw)
+    scan = replace(scan, columns=columns, pushed=tuple(pushed))
+    return Plan((scan,) + tuple(rest), pruned, optimized=True)
+
+
+def explain(plan):
+    """The optimized ``plan``, one step per line, in the order the steps run."""
+    plan = optimize(plan)
+    scan = plan.steps[0]
+    lines = [_describe(scan)]
+    lines += ['  pushed into scan: ' + _describe(s) for s in scan.pushed]
+    lines += [_describe(s) for s in plan.steps[1:]]
+    lines += ['pruned: ' + _describe(s) for s in plan.pruned]
+    return '\n'.join(lines)
+
+
+def _chunks(scan, chunksize):
+    options = read_options(scan.path, scan.adapter.spec)
+    if scan.columns is not None:
+        options['usecols'] = list(scan.columns)
+        options['dtype'] = {k: v for k, v in options['dtype'].items() if k in scan.columns}
+    if chunksize is None:
+        yield pd.read_csv(scan.path, **options)
+        return
+    with pd.read_csv(scan.path, chunksize=chunksize, **options) as reader:
+        yield from reader
+
+
+def _apply(step, frame):
+    if isinstance(step, Derive):
+        result = step.func(frame)
+        if len(step.outputs) == 1:
+            result = {step.outputs[0]: result}
+        #assign on a new frame so the chunk read from disk is never modified
+        return frame.assign(**{name: result[name] for name in step.outputs})
+    if isinstance(step, Filter):
+        return frame[frame[step.column].isin(step.values).to_numpy()]
+    if isinstance(step, Select):
+        return frame[list(step.columns)]
+    aggregations = {name: spec for name, spec in step.aggregations}
+    return frame.groupby(list(step.keys), dropna=False, observed=True).agg(**aggregations)
+
+
+def _run(plan, chunksize):
+    scan = plan.steps[0]
+    for chunk in _chunks(scan, chunksize):
+        chunk.columns = [scan.adapter.rename(c) for c in chunk.columns]
+        for step in scan.pushed + plan.steps[1:]:
+            chunk = _apply(step, chunk)
+        yield chunk
+
+
+def execute(plans, chunksize=None):
+    """Run ``plans`` (all grouped or none) and combine their results.
+
+    Grouped plans return per-group counts as int64 columns next to the
+    keys; others return their rows, concatenated.
+    """
+    grouped = [isinstance(p.steps[-1], Group) for p in plans]
+    if any(grouped) and not all(grouped):
+        raise ValueError('either all plans or none must end in a group')
+    parts = [part for plan in plans for part in _run(plan, chunksize)]
+    if not all(grouped):
+        return pd.concat(parts, ignore_index=True)
+    keys = list(plans[0].steps[-1].keys)
+    #partial counts of the same group are added up
+    total = pd.concat(parts).groupby(level=keys, dropna=False, observed=True).sum()
+    return total.astype('int64').reset_index()
+
+
+#the standard analysis
+
+def _service_inputs(adapter):
+    #the adapter's raw columns that are neither passed through, flags nor the separation type
+    return tuple(sorted(adapter.needed - set(PASSTHROUGH) - set(adapter.flags.columns)
+                        - {'separation_type'}))
+
+
+def survey_plan(adapter, path):
+    """The cleaning and grouping of ``pipeline`` for one survey, written naively.
+
+    Every column is derived first and the resignations filtered last, as
+    in the notebook; ``optimize`` reorders it.
+    """
+    return (Plan.scan(adapter, path)
+            .derive('separation_type', adapter.separation, ['separation_type'])
+            .derive('institute_service', adapter.service, _service_inputs(adapter))
+            .derive('cease_date', lambda f: parse_year(adapter.cease_date(f))[0], ['cease_date'])
+            .derive(('service_low', 'service_high'),
+                    lambda f: parse_service(f['institute_service'])[0], ['institute_service'])
+            .derive('dissatisfied', lambda f: dissatisfied(f, adapter.flags).fillna(False),
+                    adapter.flags.columns)
+            .derive('institute', lambda f: pd.Series(adapter.name, index=f.index, dtype='str'))
+            .derive('service_cat', lambda f: career_stage(f['service_low']), ['service_low'])
+            .derive('age_updated', lambda f: normalize_age(f['age']), ['age'])
+            .derive('complete', complete_rows, COMBINED_COLUMNS)
+            .filter('separation_type', 'Resignation')
+            .group(GROUP_KEYS,
+                   dissatisfied=('dissatisfied', 'sum'),
+                   responses=('dissatisfied', 'count'),
+                   rows=('dissatisfied', 'size')))
+
+
+def plan_pivots(paths, chunksize=None):
+    """The service, age and institute pivots of ``paths`` ({source name: path}) via plans."""
+    plans = [optimize(survey_plan(SOURCES[name], path)) for name, path in paths.items()]
+    return pivots_from_counts(execute(plans, chunksize))
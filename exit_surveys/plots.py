@@ -0,0 +1,28 @@
+"""Bar charts of the dissatisfaction pivots, written to image files.
+
+matplotlib is imported only when a chart is drawn, so runs that only want
+the tables never load it. Charts are drawn on a bare ``Figure`` (the Agg
+canvas) rather than through pyplot, so no GUI backend or global figure
+state is involved. Whole reports are drawn by ``render.render_figures``.
+"""
+
+#title and x-axis label of each pivot's chart, as in the notebook
+PLOT_TITLES = {
+    'service': ('Proportion Of Resignations Due To Dissatisfaction by Length of Service',
+                'Career Stage'),
+    'age': ('Proportion of resignations due to dissatisfaction by age', 'Age'),
+    'institute': ('Proportion of resignations due to dissatisfaction by institute', 'Institute'),
+}
+
+
+def plot_table(table, path, title='', xlabel=''):
+    """Draw the ``dissatisfied`` column of a pivot as a bar chart saved to ``path``."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar([str(label) for label in table.index], table['dissatisfied'].to_numpy(dtype='float64'))
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    fig.savefig(path)
+    return path
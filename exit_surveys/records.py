@@ -0,0 +1,125 @@
+"""Cleaned survey records keyed by (institute, id), with upsert across waves.
+
+DETE ``ID`` and TAFE ``Record ID`` values can collide, so records are keyed
+by the pair. A hash index maps each key to its row, so lookups are O(1).
+Upserting a new wave (for example corrected re-submissions) appends the
+new rows as a batch and retires the rows they replace; deleting retires
+rows. The dissatisfaction counts are kept in an ``AggregateStore`` and
+updated with the counts of the changed rows only (the old versions are
+subtracted and the new ones added), so the pivots never rescan the store.
+"""
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.pipeline import finish, group_counts
+from exit_surveys.sources import ingest
+from exit_surveys.store import AggregateStore
+
+KEY = ('institute', 'id')
+
+
+def _keys(rows):
+    return list(zip(*(rows[k].tolist() for k in KEY)))
+
+
+def _negated(counts):
+    counts = counts.copy()
+    counts[['dissatisfied', 'responses', 'rows']] *= -1
+    return counts
+
+
+class RecordStore:
+    """Finished survey rows (``pipeline.finish`` output) indexed by ``KEY``."""
+
+    def __init__(self, aggregates=None):
+        self.aggregates = aggregates if aggregates is not None else AggregateStore()
+        #rows are kept in the batches they arrived in; ``_live`` marks the current ones
+        self._batches = []
+        self._live = []
+        #key -> (batch, row)
+        self.index = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get(self, institute, record_id):
+        """The current row for ``(institute, record_id)``; KeyError if there is none."""
+        batch, row = self.index[(institute, record_id)]
+        return self._batches[batch].iloc[row]
+
+    def _retire(self, keys):
+        """Mark the rows of ``keys`` as replaced and return them as one frame."""
+        where = {}
+        for key in keys:
+            batch, row = self.index.pop(key)
+            where.setdefault(batch, []).append(row)
+            self._live[batch][row] = False
+        if not where:
+            return None
+        return pd.concat([self._batches[b].iloc[rows] for b, rows in where.items()],
+                         ignore_index=True)
+
+    def upsert(self, rows):
+        """Insert ``rows``, replacing any with the same key; the last of duplicates wins.
+
+        Returns ``{'inserted': n, 'updated': n}``.
+        """
+        keys = _keys(rows)
+        duplicated = pd.Index(keys).duplicated(keep='last')
+        if duplicated.any():
+            rows = rows[~duplicated]
+            keys = [k for k, d in zip(keys, duplicated) if not d]
+        rows = rows.reset_index(drop=True)
+        old = self._retire([k for k in keys if k in self.index])
+        batch = len(self._batches)
+        self._batches.append(rows)
+        self._live.append(np.ones(len(rows), dtype=bool))
+        self.index.update((key, (batch, row)) for row, key in enumerate(keys))
+        #only the changed rows are counted: subtract the old versions, add the new
+        if old is not None:
+            self.aggregates.add(_negated(group_counts(old)))
+        self.aggregates.add(group_counts(rows))
+        self._compact_if_sparse()
+        updated = 0 if old is None else len(old)
+        return {'inserted': len(rows) - updated, 'updated': updated}
+
+    def upsert_surveys(self, paths, processes=1):
+        """Clean the survey files in ``paths`` ({'DETE': path, ...}) and upsert their rows."""
+        return self.upsert(finish(ingest(paths, processes)))
+
+    def delete(self, keys):
+        """Remove the rows of ``keys`` ((institute, id) pairs); return how many existed."""
+        old = self._retire([k for k in keys if k in self.index])
+        if old is None:
+            return 0
+        self.aggregates.add(_negated(group_counts(old)))
+        self._compact_if_sparse()
+        return len(old)
+
+    def _compact_if_sparse(self):
+        live = len(self.index)
+        if live == 0:
+            self._batches, self._live = [], []
+            return
+        #a single batch is rewritten too, or its deleted rows would be kept forever
+        total = sum(len(b) for b in self._batches)
+        if total > 2 * live:
+            rows = self.frame()
+            self._batches = [rows]
+            self._live = [np.ones(len(rows), dtype=bool)]
+            self.index = {key: (0, row) for row, key in enumerate(_keys(rows))}
+
+    def frame(self):
+        """Every current row, in the order they were last upserted."""
+        parts = [b[live] for b, live in zip(self._batches, self._live) if live.any()]
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True)
+
+    def pivots(self):
+        """The service, age and institute pivots of the current rows."""
+        return self.aggregates.pivots()
@@ -0,0 +1,124 @@
+"""Batch rendering of report charts to files, skipping the unchanged ones.
+
+Every chart is described by a ``FigureSpec``: the table it draws and its
+style (title, axis label, format). The SHA-256 of the table's contents and
+the style is recorded in a manifest next to the files, and a chart whose
+hash matches its manifest entry (and whose file still exists) is not drawn
+again, so refreshing a report redraws only what changed. The rest are drawn
+on the Agg canvas by ``plots.plot_table``, in a process pool if asked.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from exit_surveys.instrument import NULL_LOG
+from exit_surveys.plots import PLOT_TITLES, plot_table
+
+MANIFEST = '.render_manifest.json'
+
+#bump when plot_table draws differently, so every chart is redrawn once
+RENDER_VERSION = 1
+
+
+#eq=False: the generated __eq__ and __hash__ would compare the table, which a frame cannot do
+@dataclass(frozen=True, eq=False)
+class FigureSpec:
+    """One chart: ``table`` drawn as ``<name>.<fmt>``; specs compare by identity."""
+    name: str
+    table: pd.DataFrame
+    title: str = ''
+    xlabel: str = ''
+    fmt: str = 'png'
+
+    @property
+    def filename(self):
+        return '{0}.{1}'.format(self.name, self.fmt)
+
+    def digest(self):
+        """Hash of everything the chart depends on: the table's contents and the style."""
+        h = hashlib.sha256()
+        style = [RENDER_VERSION, self.title, self.xlabel, self.fmt, [str(c) for c in self.table.columns]]
+        h.update(json.dumps(style).encode())
+        h.update(pd.util.hash_pandas_object(self.table, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+
+
+def _draw(spec, path):
+    return plot_table(spec.table, path, spec.title, spec.xlabel)
+
+
+def read_manifest(directory):
+    """``{filename: digest}`` of the charts last rendered in ``directory``."""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def render_figures(specs, directory, processes=1, force=False, log=NULL_LOG):
+    """Draw every chart of ``specs`` into ``directory`` unless it is unchanged.
+
+    ``force`` redraws them all. Returns ``{'written': [...], 'skipped': [...]}``
+    (paths).
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    digests = {spec.filename: spec.digest() for spec in specs}
+    todo, skipped = [], []
+    for spec in specs:
+        path = os.path.join(directory, spec.filename)
+        if not force and manifest.get(spec.filename) == digests[spec.filename] and os.path.exists(path):
+            skipped.append(path)
+        else:
+            todo.append((spec, path))
+    with log.stage('render', len(specs), skipped=len(skipped)) as stage:
+        if processes == 1 or len(todo) < 2:
+            written = [_draw(spec, path) for spec, path in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                written = list(pool.map(_draw, *zip(*todo)))
+        stage['rows_out'] = len(written)
+    #recorded only once drawn, so an interrupted run redraws what it did not finish
+    manifest.update((spec.filename, digests[spec.filename]) for spec, _ in todo)
+    _write_manifest(directory, manifest)
+    return {'written': written, 'skipped': skipped}
+
+
+def pivot_specs(tables, fmt='png', prefix=''):
+    """A ``FigureSpec`` per pivot in ``tables`` ({name: table}), titled as in the notebook."""
+    specs = []
+    for name, table in tables.items():
+        title, xlabel = PLOT_TITLES.get(name, (name, ''))
+        specs.append(FigureSpec(prefix + name, table, title, xlabel, fmt))
+    return specs
+
+
+def institute_specs(counts, fmt='png'):
+    """Service and age charts for each institute, from ``group_counts`` output.
+
+    They are named ``<institute>_service`` and ``<institute>_age`` and
+    titled with the institute.
+    """
+    from exit_surveys.pipeline import pivots_from_counts
+
+    specs = []
+    for institute in sorted(counts['institute'].dropna().unique()):
+        tables = pivots_from_counts(counts[counts['institute'] == institute])
+        for name in ('service', 'age'):
+            title, xlabel = PLOT_TITLES[name]
+            specs.append(FigureSpec('{0}_{1}'.format(institute, name), tables[name],
+                                    '{0} ({1})'.format(title, institute), xlabel, fmt))
+    return specs
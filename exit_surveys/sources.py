@@ -0,0 +1,256 @@
+"""Registry of survey sources and parallel ingestion.
+
+Each institute's export is described by a ``SourceAdapter``: how to read it,
+how to rename its columns, which rows are resignations, where to find
+dissatisfaction, and how to get the length of service and cease year.
+``clean_source`` turns any registered export into the shared
+``CLEANED_COLUMNS``, and ``ingest`` cleans several exports in parallel, one
+process per source, before concatenating them.
+
+Adapters are sent to worker processes by pickling, so their functions must
+be defined at module level.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Callable
+
+import pandas as pd
+
+from exit_surveys.compact import compact_frame, unify_categories
+from exit_surveys.dates import parse_service, parse_year
+from exit_surveys.flags import DETE_FLAGS, TAFE_FLAGS, FlagSpec, dissatisfied
+from exit_surveys.instrument import NULL_LOG
+from exit_surveys.loader import DETE_SPEC, TAFE_SPEC, SurveySpec, load_survey
+from exit_surveys.strings import extract_unique
+
+#the columns each survey contributes before the categories are derived
+CLEANED_COLUMNS = [
+    'id',
+    'separation_type',
+    'position',
+    'employment_status',
+    'gender',
+    'age',
+    'dissatisfied',
+    'institute',
+    'institute_service',
+    'service_low',
+    'service_high',
+    'cease_date',
+]
+
+#columns clean_source copies through unchanged (after renaming)
+PASSTHROUGH = ['id', 'position', 'employment_status', 'gender', 'age']
+
+
+@dataclass(frozen=True)
+class SourceAdapter:
+    """How to turn one institute's raw export into ``CLEANED_COLUMNS``.
+
+    ``rename`` maps a raw header to its cleaned name. ``separation``,
+    ``service`` and ``cease_date`` take the renamed frame; ``separation``
+    returns the normalized separation type of every row and ``service`` and
+    ``cease_date`` the raw values for the resigned rows, which
+    ``clean_source`` reads with ``parse_service`` and ``parse_year``.
+    """
+
+    name: str
+    spec: SurveySpec
+    rename: Callable
+    separation: Callable
+    flags: FlagSpec
+    service: Callable
+    cease_date: Callable
+    #cleaned names of the raw columns the cleaning reads
+    needed: frozenset
+
+
+SOURCES = {}
+
+
+def register_source(adapter):
+    """Add ``adapter`` to ``SOURCES`` under its name, replacing any previous one."""
+    SOURCES[adapter.name] = adapter
+    return adapter
+
+
+def clean_source(adapter, frame, log=NULL_LOG, compact=False):
+    """Resignations from a raw ``adapter`` frame, reduced to ``CLEANED_COLUMNS``.
+
+    Only the ``adapter.needed`` columns are carried through the row filter,
+    so the raw frame is never copied as a whole. Each step is timed as a
+    stage of ``log``. ``compact`` returns the columns in compact dtypes
+    (see ``compact.compact_frame``).
+    """
+    source = adapter.name
+    names = {raw: adapter.rename(raw) for raw in frame.columns}
+    with log.stage('drop columns', len(frame), source=source) as stage:
+        frame = frame[[raw for raw, name in names.items() if name in adapter.needed]]
+        stage['rows_out'] = len(frame)
+    with log.stage('rename', len(frame), source=source) as stage:
+        frame.columns = [names[raw] for raw in frame.columns]
+        stage['rows_out'] = len(frame)
+    with log.stage('resignation filter', len(frame), source=source) as stage:
+        separation = adapter.separation(frame)
+        resigned = separation == 'Resignation'
+        resignations = frame[resigned]
+        stage['rows_out'] = len(resignations)
+    rows = len(resignations)
+    cleaned = {col: resignations[col] for col in PASSTHROUGH}
+    cleaned.update(separation_type=separation[resigned], institute=source)
+    with log.stage('date fix', rows, source=source) as stage:
+        cleaned['cease_date'], stage['unparseable'] = parse_year(adapter.cease_date(resignations))
+        stage['rows_out'] = rows
+    with log.stage('service length', rows, source=source) as stage:
+        service = cleaned['institute_service'] = adapter.service(resignations)
+        bounds, stage['unparseable'] = parse_service(service)
+        cleaned.update(bounds)
+        stage['rows_out'] = rows
+    with log.stage('dissatisfaction flag', rows, source=source) as stage:
+        cleaned['dissatisfied'] = dissatisfied(resignations, adapter.flags)
+        stage['rows_out'] = rows
+    result = pd.DataFrame(cleaned, index=resignations.index, columns=CLEANED_COLUMNS)
+    return compact_frame(result) if compact else result
+
+
+def clean_file(adapter, path, log=NULL_LOG, compact=False):
+    """Load ``path`` with ``adapter.spec`` and clean it."""
+    with log.stage('load', source=adapter.name) as stage:
+        frame, _ = load_survey(path, adapter.spec, compact)
+        stage['rows_out'] = len(frame)
+    return clean_source(adapter, frame, log, compact)
+
+
+def _clean_logged(adapter, path, log, compact):
+    """``clean_file`` in a worker process, returning the frame and the worker's log."""
+    return clean_file(adapter, path, log, compact), log
+
+
+def clean_files(paths, processes=None, log=None, compact=False):
+    """Clean every export in ``paths`` ({source name: path}); return the frames in that order.
+
+    Sources are cleaned in a process pool of ``processes`` workers (default:
+    one per source, capped at the CPU count); ``processes=1`` cleans them in
+    this process. With a ``log``, each worker times its stages in a child
+    log (the records carry the source) that is merged into ``log``.
+    """
+    adapters = [SOURCES[name] for name in paths]
+    files = list(paths.values())
+    if processes == 1 or len(files) == 1:
+        return [clean_file(a, p, log or NULL_LOG, compact) for a, p in zip(adapters, files)]
+    workers = processes or min(len(files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if log is None:
+            return list(pool.map(clean_file, adapters, files, repeat(NULL_LOG), repeat(compact)))
+        results = list(pool.map(_clean_logged, adapters, files,
+                                [log.child() for _ in files], repeat(compact)))
+    for _, child in results:
+        log.merge(child)
+    return [frame for frame, _ in results]
+
+
+def concat_cleaned(frames, log=NULL_LOG, compact=False):
+    """Concatenate cleaned frames, keeping compact categoricals categorical if ``compact``."""
+    with log.stage('concat', sum(len(f) for f in frames)) as stage:
+        if compact:
+            frames = unify_categories(frames)
+        combined = pd.concat(frames, ignore_index=True)
+        if compact:
+            #columns whose compact dtypes differ between sources (institute_service)
+            combined = compact_frame(combined)
+        stage['rows_out'] = len(combined)
+    return combined
+
+
+def ingest(paths, processes=None, log=None, compact=False):
+    """Clean every export in ``paths`` ({source name: path}) and concatenate them.
+
+    Rows keep the order of ``paths``; see ``clean_files`` for ``processes``
+    and ``log``. ``compact`` reads and cleans every source in compact dtypes
+    and keeps the categoricals through the concat.
+    """
+    frames = clean_files(paths, processes, log, compact)
+    return concat_cleaned(frames, log or NULL_LOG, compact)
+
+
+#DETE
+
+def dete_column_name(raw):
+    """Lowercase, strip and underscore a DETE header; fix ``separationtype``."""
+    name = raw.lower().strip().replace(' ', '_')
+    return {'separationtype': 'separation_type'}.get(name, name)
+
+
+def dete_separation(frame):
+    #cut strings at the dash, so that we are only left with 'Resignation'
+    return extract_unique(frame['separation_type'], r'^([^-]*)')
+
+
+def dete_cease_date(frame):
+    #'YYYY' or 'MM/YYYY'
+    return frame['cease_date']
+
+
+def dete_service(frame):
+    years, _ = parse_year(frame['cease_date'])
+    return years - frame['dete_start_date']
+
+
+DETE = register_source(SourceAdapter(
+    name='DETE',
+    spec=DETE_SPEC,
+    rename=dete_column_name,
+    separation=dete_separation,
+    flags=DETE_FLAGS,
+    service=dete_service,
+    cease_date=dete_cease_date,
+    needed=frozenset(PASSTHROUGH + ['separation_type', 'cease_date', 'dete_start_date']
+                     + list(DETE_FLAGS.columns)),
+))
+
+
+#TAFE
+
+TAFE_MAPPER = {
+    'Record ID': 'id',
+    'CESSATION YEAR': 'cease_date',
+    'Reason for ceasing employment': 'separation_type',
+    'Gender. What is your Gender?': 'gender',
+    'CurrentAge. Current Age': 'age',
+    'Employment Type. Employment Type': 'employment_status',
+    'Classification. Classification': 'position',
+    'LengthofServiceOverall. Overall Length of Service at Institute (in years)': 'institute_service',
+    'LengthofServiceCurrent. Length of Service at current workplace (in years)': 'role_service',
+}
+
+
+def tafe_column_name(raw):
+    return TAFE_MAPPER.get(raw, raw)
+
+
+def tafe_separation(frame):
+    return frame['separation_type']
+
+
+def tafe_service(frame):
+    return frame['institute_service']
+
+
+def tafe_cease_date(frame):
+    return frame['cease_date']
+
+
+TAFE = register_source(SourceAdapter(
+    name='TAFE',
+    spec=TAFE_SPEC,
+    rename=tafe_column_name,
+    separation=tafe_separation,
+    flags=TAFE_FLAGS,
+    service=tafe_service,
+    cease_date=tafe_cease_date,
+    needed=frozenset(PASSTHROUGH + ['separation_type', 'cease_date', 'institute_service']
+                     + list(TAFE_FLAGS.columns)),
+))
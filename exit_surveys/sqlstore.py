@@ -0,0 +1,146 @@
+"""SQLite-backed out-of-core mode for the exit-survey pivots.
+
+Cleaned rows are streamed chunk by chunk into one indexed SQLite table, so
+years of survey waves can be analysed on a small worker without holding
+them in memory. The database runs in WAL mode, rows go in through batched
+``executemany`` inside one transaction per batch, and the indexes are
+built (or extended) after each load. The service, age and institute
+proportions are SQL aggregates, answered from covering indexes.
+"""
+
+import sqlite3
+
+import pandas as pd
+
+from exit_surveys.ages import age_bands
+from exit_surveys.binning import SERVICE_LABELS
+from exit_surveys.pipeline import complete_rows
+from exit_surveys.streaming import DEFAULT_CHUNKSIZE, iter_cleaned
+
+TABLE = 'responses'
+
+#column name -> SQLite type; (institute, id) is the key, as in ``records``
+COLUMNS = {
+    'institute': 'TEXT NOT NULL',
+    'id': 'REAL',
+    'position': 'TEXT',
+    'employment_status': 'TEXT',
+    'gender': 'TEXT',
+    'age': 'TEXT',
+    'service_cat': 'TEXT',
+    'age_updated': 'TEXT',
+    'cease_date': 'INTEGER',
+    'dissatisfied': 'INTEGER',
+    'complete': 'INTEGER NOT NULL',
+}
+
+#each pivot reads only its index: (filter, key, measure)
+INDEXES = {
+    'ix_service': ('service_cat', 'dissatisfied'),
+    'ix_age': ('complete', 'age_updated', 'dissatisfied'),
+    'ix_institute': ('complete', 'institute', 'dissatisfied'),
+}
+
+#columns that proportions() may group by
+GROUPABLE = ('institute', 'service_cat', 'age_updated', 'cease_date', 'gender',
+             'employment_status', 'position')
+
+DEFAULT_BATCH_ROWS = 50000
+
+
+class SurveyDatabase:
+    """Cleaned survey rows in the SQLite database at ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        #with WAL, NORMAL only risks the last transactions on power loss, never corruption
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        columns = ', '.join('{0} {1}'.format(name, kind) for name, kind in COLUMNS.items())
+        self.connection.execute('CREATE TABLE IF NOT EXISTS {0} ({1}, PRIMARY KEY (institute, id))'
+                                .format(TABLE, columns))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def create_indexes(self):
+        for name, columns in INDEXES.items():
+            self.connection.execute('CREATE INDEX IF NOT EXISTS {0} ON {1} ({2})'.format(
+                name, TABLE, ', '.join(columns)))
+        self.connection.execute('ANALYZE')
+        self.connection.commit()
+
+    def _insert(self, rows, batch_rows):
+        """Insert or replace the finished ``rows``, ``batch_rows`` per transaction."""
+        if 'complete' not in rows:
+            rows = rows.assign(complete=complete_rows(rows))
+        values = rows[list(COLUMNS)]
+        #Python scalars with None for missing values, which is what sqlite3 binds
+        values = values.astype(object).where(values.notna(), None)
+        sql = 'INSERT OR REPLACE INTO {0} ({1}) VALUES ({2})'.format(
+            TABLE, ', '.join(COLUMNS), ', '.join('?' * len(COLUMNS)))
+        for start in range(0, len(values), batch_rows):
+            batch = values.iloc[start:start + batch_rows]
+            with self.connection:
+                self.connection.executemany(sql, batch.itertuples(index=False, name=None))
+        return len(values)
+
+    def load_frame(self, combined, batch_rows=DEFAULT_BATCH_ROWS):
+        """Load finished rows (``pipeline.finish`` output); return how many."""
+        count = self._insert(combined, batch_rows)
+        self.create_indexes()
+        return count
+
+    def load_surveys(self, paths, chunksize=DEFAULT_CHUNKSIZE, batch_rows=DEFAULT_BATCH_ROWS):
+        """Stream raw survey files ({'DETE': path, ...}) into the database; return the rows loaded.
+
+        Indexes are built once at the end, so the inserts do not maintain them.
+        """
+        count = sum(self._insert(cleaned, batch_rows) for cleaned in iter_cleaned(paths, chunksize))
+        self.create_indexes()
+        return count
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM {0}'.format(TABLE)).fetchone()[0]
+
+    def proportions(self, by, complete=True, labels=None):
+        """Proportion dissatisfied and responses per ``by``, computed in SQL.
+
+        As in the pivots, ``complete`` counts only complete rows and rows
+        missing ``by`` are left out. ``labels`` reindexes a 1-D result.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = set(by) - set(GROUPABLE)
+        if unknown:
+            raise KeyError('cannot group by {0}'.format(', '.join(sorted(unknown))))
+        where = ['{0} IS NOT NULL'.format(c) for c in by]
+        if complete:
+            where.insert(0, 'complete = 1')
+        keys = ', '.join(by)
+        sql = ('SELECT {0}, SUM(dissatisfied), COUNT(dissatisfied) FROM {1} WHERE {2} '
+               'GROUP BY {0}'.format(keys, TABLE, ' AND '.join(where)))
+        rows = self.connection.execute(sql).fetchall()
+        table = pd.DataFrame(rows, columns=by + ['dissatisfied', 'responses']).set_index(by)
+        table['dissatisfied'] = table['dissatisfied'] / table['responses']
+        if labels is not None:
+            table = table.reindex(labels)
+        return table
+
+    def pivots(self):
+        """The service, age and institute pivots of ``pipeline.pivots``."""
+        institutes = [row[0] for row in self.connection.execute(
+            'SELECT DISTINCT institute FROM {0} WHERE complete = 1 ORDER BY institute'.format(TABLE))]
+        return {
+            'service': self.proportions('service_cat', complete=False,
+                                        labels=list(SERVICE_LABELS))[['dissatisfied']],
+            'age': self.proportions('age_updated', labels=age_bands())[['dissatisfied']],
+            'institute': self.proportions('institute', labels=institutes)[['dissatisfied']],
+        }
@@ -0,0 +1,83 @@
+"""Persistent, incremental store of dissatisfaction counts.
+
+The store keeps dissatisfied/response/row counts keyed by ``GROUP_KEYS``
+(institute, service category, age band, cease year and whether the row is
+complete). A new survey wave is cleaned on its own and added as a delta;
+the pivots are then computed from the stored counts, never from the raw
+history.
+"""
+
+import os
+
+import pandas as pd
+
+from exit_surveys.pipeline import GROUP_KEYS, group_counts, pivots_from_counts
+from exit_surveys.streaming import (
+    DEFAULT_CHUNKSIZE,
+    fold_counts,
+    stream_counts,
+    totals_frame,
+)
+
+
+class AggregateStore:
+    """Running counts per group, saved to a CSV file at ``path``."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.totals = {}
+        if path is not None and os.path.exists(path):
+            self.add(pd.read_csv(path))
+
+    def add(self, counts):
+        """Add a ``group_counts``-shaped frame; negative counts subtract."""
+        fold_counts(self.totals, counts)
+        #drop groups that a subtraction has emptied
+        for key in [k for k, v in self.totals.items() if not any(v)]:
+            del self.totals[key]
+        return self
+
+    def add_frame(self, combined):
+        """Add cleaned, combined rows (the output of ``pipeline.finish``)."""
+        return self.add(group_counts(combined))
+
+    def add_surveys(self, paths, chunksize=DEFAULT_CHUNKSIZE):
+        """Stream raw survey files ({'DETE': path, ...}) into the store."""
+        counts, _ = stream_counts(paths, chunksize)
+        return self.add(counts)
+
+    def counts(self):
+        return totals_frame(self.totals)
+
+    def pivots(self):
+        """The service, age and institute pivots over everything added so far."""
+        return pivots_from_counts(self.counts())
+
+    def proportions(self, by, complete=True):
+        """Proportion dissatisfied grouped by any of ``GROUP_KEYS``.
+
+        With ``complete`` only rows without missing values are counted, as
+        in the age and institute pivots.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = set(by) - set(GROUP_KEYS)
+        if unknown:
+            raise KeyError('not a stored key: {0}'.format(', '.join(sorted(unknown))))
+        counts = self.counts()
+        if complete:
+            counts = counts[counts['complete'].astype(bool)]
+        grouped = counts.dropna(subset=by).groupby(by)[['dissatisfied', 'responses']].sum()
+        return pd.DataFrame({'dissatisfied': grouped['dissatisfied'] / grouped['responses'],
+                             'responses': grouped['responses']})
+
+    def save(self, path=None):
+        """Write the counts to ``path`` (default: the path the store was opened with)."""
+        path = path or self.path
+        if path is None:
+            raise ValueError('no path to save the aggregate store to')
+        #write then rename, so a crash never leaves a half-written store
+        tmp = path + '.tmp'
+        self.counts().to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        self.path = path
+        return path
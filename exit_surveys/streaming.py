@@ -0,0 +1,91 @@
+"""Chunked streaming mode for surveys larger than memory.
+
+Each survey is read in fixed-size chunks with only the raw columns the
+cleaning needs. Every chunk is cleaned (which filters to resignations),
+reduced to per-group counts, and folded into running totals, so memory is
+bounded by the chunk size and the number of groups, not by the input size.
+The pivots come from the same ``pivots_from_counts`` as the in-memory path.
+"""
+
+import os
+
+import pandas as pd
+
+from exit_surveys.loader import read_options
+from exit_surveys.pipeline import GROUP_KEYS, finish, group_counts, pivots_from_counts
+from exit_surveys.sources import SOURCES, clean_source
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def iter_survey(path, spec, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Yield ``path`` in chunks of ``chunksize`` rows, pruned as in ``spec``.
+
+    ``columns`` narrows the read further to the given raw column names.
+    """
+    options = read_options(path, spec)
+    if columns is not None:
+        options['usecols'] = [c for c in options['usecols'] if c in columns]
+        options['dtype'] = {k: v for k, v in options['dtype'].items() if k in columns}
+    reader = pd.read_csv(path, chunksize=chunksize, **options)
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _key(value):
+    #NaN != NaN, so missing keys are folded under None
+    return None if pd.isna(value) else value
+
+
+def fold_counts(totals, counts):
+    """Add a ``group_counts`` frame into the ``totals`` dict in place."""
+    for row in counts.itertuples(index=False):
+        key = tuple(_key(getattr(row, k)) for k in GROUP_KEYS)
+        running = totals.setdefault(key, [0, 0, 0])
+        running[0] += int(row.dissatisfied)
+        running[1] += int(row.responses)
+        running[2] += int(row.rows)
+    return totals
+
+
+def totals_frame(totals):
+    """Turn folded ``totals`` back into a ``group_counts``-shaped frame."""
+    records = [key + tuple(values) for key, values in totals.items()]
+    return pd.DataFrame.from_records(
+        records, columns=GROUP_KEYS + ['dissatisfied', 'responses', 'rows'])
+
+
+def iter_cleaned(paths, chunksize=DEFAULT_CHUNKSIZE, stats=None):
+    """Yield every survey in ``paths`` ({source name: path}) as cleaned, finished chunks.
+
+    If ``stats`` is a dict, the rows and bytes read per survey are put in it.
+    """
+    for name, path in paths.items():
+        adapter = SOURCES[name]
+        header = pd.read_csv(path, nrows=0).columns
+        columns = {c for c in header if adapter.rename(c) in adapter.needed}
+        rows = 0
+        for chunk in iter_survey(path, adapter.spec, chunksize, columns):
+            rows += len(chunk)
+            yield finish(clean_source(adapter, chunk))
+        if stats is not None:
+            stats[name] = {'rows': rows, 'bytes': os.path.getsize(path)}
+
+
+def stream_counts(paths, chunksize=DEFAULT_CHUNKSIZE):
+    """Fold every survey in ``paths`` ({source name: path}) into group counts.
+
+    Returns ``(counts, stats)`` where ``stats`` has rows and bytes read per survey.
+    """
+    totals = {}
+    stats = {}
+    for cleaned in iter_cleaned(paths, chunksize, stats):
+        fold_counts(totals, group_counts(cleaned))
+    return totals_frame(totals), stats
+
+
+def stream_pivots(paths, chunksize=DEFAULT_CHUNKSIZE):
+    """The service, age and institute pivots computed chunk by chunk."""
+    counts, _ = stream_counts(paths, chunksize)
+    return pivots_from_counts(counts)
@@ -0,0 +1,84 @@
+"""Factorize-then-map engine for cleaning low-cardinality string columns.
+
+Survey columns such as ``separation_type``, ``cease_date`` or
+``institute_service`` hold a few dozen distinct strings spread over every
+row. ``map_unique`` factorizes a column, runs the cleaning function on the
+distinct values only, and broadcasts the results back through the integer
+codes, so the Python/regex work scales with the number of distinct values
+rather than the number of rows. Results are memoized per cleaning function
+for the life of the process, so later chunks and later runs only clean the
+values they have not seen before.
+"""
+
+import re
+
+import pandas as pd
+
+#cleaning function key -> {raw value: cleaned value}
+_MEMO = {}
+
+#a function's memo is dropped when it grows past this many values, so a
+#high-cardinality column cannot grow it without bound
+MEMO_LIMIT = 100000
+
+#pandas 3's 'str' dtype keeps missing values missing; on 2.x astype('str')
+#writes them as the strings 'None' and 'nan', so strings stay objects there
+STRING_DTYPE = 'str' if int(pd.__version__.split('.')[0]) >= 3 else object
+
+
+def clear_memo():
+    """Forget every memoized result."""
+    _MEMO.clear()
+
+
+def map_codes(values, func, key=None):
+    """Factorize ``values`` and apply ``func`` to each distinct non-missing value once.
+
+    Returns ``(codes, results)``: the factorize codes (-1 where ``values``
+    is missing) and ``func`` of each distinct value in code order. ``key``
+    names the memo the results are kept in; it defaults to ``func`` itself,
+    so pass one when ``func`` is built on every call (e.g. a closure over a
+    pattern).
+    """
+    codes, uniques = pd.factorize(values)
+    memo = _MEMO.setdefault(func if key is None else key, {})
+    if len(memo) + len(uniques) > MEMO_LIMIT:
+        memo.clear()
+    results = []
+    for raw in uniques:
+        try:
+            cleaned = memo[raw]
+        except KeyError:
+            cleaned = memo[raw] = func(raw)
+        results.append(cleaned)
+    return codes, results
+
+
+def map_unique(values, func, dtype=object, missing=None, key=None):
+    """``func`` of every value of ``values``, computed once per distinct value.
+
+    Returns a Series aligned with ``values`` (of ``dtype``), with ``missing``
+    where ``values`` is missing. ``key`` is as in ``map_codes``.
+    """
+    codes, results = map_codes(values, func, key)
+    #missing values have code -1, which picks the trailing ``missing``
+    lookup = pd.Series(results + [missing], dtype=object)
+    if dtype is not object:
+        lookup = lookup.astype(dtype)
+    index = values.index if isinstance(values, pd.Series) else None
+    return pd.Series(lookup.array.take(codes), index=index, name=getattr(values, 'name', None))
+
+
+def extract_unique(values, pattern, dtype=STRING_DTYPE):
+    """First group of ``pattern`` in each value (as ``str.extract``), cast to ``dtype``.
+
+    Non-string values are matched as ``str(value)``; values without a match
+    become missing, as do missing values.
+    """
+    regex = re.compile(pattern)
+
+    def first_group(raw):
+        match = regex.search(str(raw))
+        return match.group(1) if match else None
+
+    return map_unique(values, first_group, dtype, key=('extract', pattern))
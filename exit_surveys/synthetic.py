@@ -0,0 +1,214 @@
+"""Synthetic DETE- and TAFE-shaped exit surveys of any size.
+
+The generated files have the same columns as the real exports (56 for DETE,
+72 for TAFE) and the same kinds of mess: ``Not Stated`` tokens, dashes for
+unticked factors, cease dates as either ``YYYY`` or ``MM/YYYY``, service
+lengths as range strings, and age ranges written with dashes or double
+spaces. Files are written in chunks, so memory does not grow with the row
+count. Each chunk draws from its own child of ``SeedSequence(seed)``, so
+the chunks of different seeds never share a stream.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+DETE_COLUMNS = [
+    'ID', 'SeparationType', 'Cease Date', 'DETE Start Date', 'Role Start Date',
+    'Position', 'Classification', 'Region', 'Business Unit', 'Employment Status',
+    'Career move to public sector', 'Career move to private sector',
+    'Interpersonal conflicts', 'Job dissatisfaction',
+    'Dissatisfaction with the department', 'Physical work environment',
+    'Lack of recognition', 'Lack of job security', 'Work location',
+    'Employment conditions', 'Maternity/family', 'Relocation', 'Study/Travel',
+    'Ill Health', 'Traumatic incident', 'Work life balance', 'Workload',
+    'None of the above', 'Professional Development', 'Opportunities for promotion',
+    'Staff morale', 'Workplace issue', 'Physical environment', 'Worklife balance',
+    'Stress and pressure support', 'Performance of supervisor', 'Peer support',
+    'Initiative', 'Skills', 'Coach', 'Career Aspirations', 'Feedback', 'Further PD',
+    'Communication', 'My say', 'Information', 'Kept informed', 'Wellness programs',
+    'Health & Safety', 'Gender', 'Age', 'Aboriginal', 'Torres Strait', 'South Sea',
+    'Disability', 'NESB',
+]
+
+TAFE_FACTORS = [
+    'Career Move - Public Sector ', 'Career Move - Private Sector ',
+    'Career Move - Self-employment', 'Ill Health', 'Maternity/Family',
+    'Dissatisfaction', 'Job Dissatisfaction', 'Interpersonal Conflict', 'Study',
+    'Travel', 'Other', 'NONE',
+]
+
+#the 49 opinion columns between the factors and the demographics, which the
+#analysis drops; their exact wording does not matter here
+TAFE_VIEWS = (['Main Factor. Which of these was the main factor for leaving?']
+              + ['InstituteViews. Topic:{0}'.format(i) for i in range(1, 14)]
+              + ['WorkUnitViews. Topic:{0}'.format(i) for i in range(14, 31)]
+              + ['Induction. Topic:{0}'.format(i) for i in range(1, 10)]
+              + ['Workplace. Topic:{0}'.format(i) for i in range(1, 10)])
+
+TAFE_COLUMNS = (
+    ['Record ID', 'Institute', 'WorkArea', 'CESSATION YEAR', 'Reason for ceasing employment']
+    + ['Contributing Factors. ' + f for f in TAFE_FACTORS]
+    + TAFE_VIEWS
+    + ['Gender. What is your Gender?', 'CurrentAge. Current Age',
+       'Employment Type. Employment Type', 'Classification. Classification',
+       'LengthofServiceOverall. Overall Length of Service at Institute (in years)',
+       'LengthofServiceCurrent. Length of Service at current workplace (in years)']
+)
+
+DEFAULT_CHUNK_ROWS = 250000
+
+#written next to the surveys by write_surveys, recording what they hold
+MANIFEST = 'synthetic.json'
+
+
+def _pick(rng, rows, values, p=None):
+    values = np.array(values, dtype=object)
+    return values[rng.choice(len(values), size=rows, p=p)]
+
+
+def _years(rng, rows, low, high, missing=0.0, token='Not Stated'):
+    years = rng.integers(low, high + 1, size=rows).astype(str).astype(object)
+    years[rng.random(rows) < missing] = token
+    return years
+
+
+def make_dete(rows, seed=0, start_id=1):
+    """A DETE-shaped frame of ``rows`` rows."""
+    rng = np.random.default_rng(seed)
+    data = {'ID': np.arange(start_id, start_id + rows)}
+    data['SeparationType'] = _pick(rng, rows, [
+        'Age Retirement', 'Resignation-Other reasons', 'Resignation-Other employer',
+        'Resignation-Move overseas/interstate', 'Voluntary Early Retirement (VER)',
+        'Ill Health Retirement', 'Other', 'Contract Expired', 'Termination'],
+        p=[0.36, 0.18, 0.11, 0.09, 0.08, 0.07, 0.06, 0.03, 0.02])
+    #cease dates are a mix of years and month/year
+    cease = rng.integers(2006, 2015, size=rows)
+    month = rng.integers(1, 13, size=rows)
+    with_month = rng.random(rows) < 0.4
+    cease_date = cease.astype(str).astype(object)
+    cease_date[with_month] = ['{0:02d}/{1}'.format(m, y) for m, y in
+                              zip(month[with_month], cease[with_month])]
+    cease_date[rng.random(rows) < 0.04] = 'Not Stated'
+    data['Cease Date'] = cease_date
+    start = cease - rng.integers(0, 40, size=rows)
+    data['DETE Start Date'] = start.astype(str).astype(object)
+    data['DETE Start Date'][rng.random(rows) < 0.09] = 'Not Stated'
+    data['Role Start Date'] = (start + rng.integers(0, 5, size=rows)).astype(str).astype(object)
+    data['Role Start Date'][rng.random(rows) < 0.12] = 'Not Stated'
+    data['Position'] = _pick(rng, rows, ['Teacher', 'Teacher Aide', 'Public Servant',
+                                         'Cleaner', 'Head of Curriculum/Head of Special Education',
+                                         'Schools Officer', None],
+                             p=[0.39, 0.15, 0.15, 0.14, 0.05, 0.07, 0.05])
+    data['Classification'] = _pick(rng, rows, ['Primary', 'Secondary', 'A01-A04', 'AO5-AO7',
+                                               'Special Education', None])
+    data['Region'] = _pick(rng, rows, ['Metropolitan', 'Central Office', 'South East',
+                                       'Darling Downs South West', 'Far North Queensland',
+                                       'Not Stated'])
+    data['Business Unit'] = _pick(rng, rows, ['Education Queensland', 'Information and Technologies',
+                                              None], p=[0.05, 0.03, 0.92])
+    data['Employment Status'] = _pick(rng, rows, ['Permanent Full-time', 'Permanent Part-time',
+                                                  'Temporary Full-time', 'Temporary Part-time',
+                                                  'Casual', None],
+                                      p=[0.53, 0.27, 0.07, 0.03, 0.03, 0.07])
+    for col in DETE_COLUMNS[10:28]:
+        data[col] = rng.random(rows) < 0.12
+    for col in DETE_COLUMNS[28:49]:
+        data[col] = _pick(rng, rows, ['A', 'SA', 'N', 'D', 'SD', 'M', None])
+    data['Gender'] = _pick(rng, rows, ['Female', 'Male', None], p=[0.70, 0.27, 0.03])
+    data['Age'] = _pick(rng, rows, ['20 or younger', '21-25', '26-30', '31-35', '36-40',
+                                    '41-45', '46-50', '51-55', '56-60', '61 or older', None])
+    for col in DETE_COLUMNS[51:]:
+        data[col] = _pick(rng, rows, ['Yes', None], p=[0.03, 0.97])
+    return pd.DataFrame(data, columns=DETE_COLUMNS)
+
+
+def make_tafe(rows, seed=0, start_id=1):
+    """A TAFE-shaped frame of ``rows`` rows."""
+    rng = np.random.default_rng(seed)
+    data = {'Record ID': 6.341330e17 + (np.arange(start_id, start_id + rows) * 1.0e5)}
+    data['Institute'] = _pick(rng, rows, ['Brisbane North Institute of TAFE',
+                                          'Southern Queensland Institute of TAFE',
+                                          'Sunshine Coast Institute of TAFE',
+                                          'Tropical North Institute of TAFE',
+                                          'Central Queensland Institute of TAFE'])
+    data['WorkArea'] = _pick(rng, rows, ['Non-Delivery (corporate)', 'Delivery (teaching)'])
+    cessation = rng.integers(2009, 2014, size=rows).astype(float)
+    cessation[rng.random(rows) < 0.01] = np.nan
+    data['CESSATION YEAR'] = cessation
+    data['Reason for ceasing employment'] = _pick(
+        rng, rows, ['Resignation', 'Contract Expired', 'Retrenchment/ Redundancy',
+                    'Retirement', 'Transfer', 'Termination', None],
+        p=[0.49, 0.18, 0.15, 0.12, 0.03, 0.02, 0.01])
+    for factor in TAFE_FACTORS:
+        col = 'Contributing Factors. ' + factor
+        #ticked factors repeat the factor's text, unticked ones are a dash
+        data[col] = _pick(rng, rows, [factor.strip(), '-', None], p=[0.10, 0.76, 0.14])
+    for col in TAFE_VIEWS:
+        data[col] = _pick(rng, rows, ['Agree', 'Strongly Agree', 'Neutral', 'Disagree',
+                                      'Strongly Disagree', 'Not Applicable', None])
+    data['Gender. What is your Gender?'] = _pick(rng, rows, ['Female', 'Male', None],
+                                                 p=[0.55, 0.30, 0.15])
+    data['CurrentAge. Current Age'] = _pick(rng, rows, [
+        '20 or younger', '21  25', '26  30', '31  35', '36  40', '41  45', '46  50',
+        '51-55', '56 or older', None])
+    data['Employment Type. Employment Type'] = _pick(rng, rows, [
+        'Permanent Full-time', 'Permanent Part-time', 'Temporary Full-time',
+        'Temporary Part-time', 'Contract/casual', None])
+    data['Classification. Classification'] = _pick(rng, rows, [
+        'Administration (AO)', 'Teacher (including LVT)', 'Professional Officer (PO)',
+        'Operational (OO)', 'Workplace Training Officer', None])
+    service = ['Less than 1 year', '1-2', '3-4', '5-6', '7-10', '11-20',
+               'More than 20 years', None]
+    data['LengthofServiceOverall. Overall Length of Service at Institute (in years)'] = \
+        _pick(rng, rows, service, p=[0.11, 0.10, 0.09, 0.06, 0.04, 0.04, 0.03, 0.53])
+    data['LengthofServiceCurrent. Length of Service at current workplace (in years)'] = \
+        _pick(rng, rows, service, p=[0.13, 0.11, 0.08, 0.05, 0.04, 0.03, 0.02, 0.54])
+    return pd.DataFrame(data, columns=TAFE_COLUMNS)
+
+
+def write_survey(path, make, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write ``rows`` rows from ``make`` (``make_dete``/``make_tafe``) to ``path`` in chunks."""
+    seeds = np.random.SeedSequence(seed).spawn(max(1, -(-rows // chunk_rows)))
+    written = 0
+    chunk = 0
+    with open(path, 'w', newline='') as f:
+        while written < rows or chunk == 0:
+            n = min(chunk_rows, rows - written)
+            frame = make(n, seed=seeds[chunk], start_id=written + 1)
+            frame.to_csv(f, index=False, header=(chunk == 0))
+            written += n
+            chunk += 1
+    return path
+
+
+def write_surveys(directory, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write ``dete_survey.csv`` and ``tafe_survey.csv`` of ``rows`` rows each.
+
+    Returns ``{'DETE': path, 'TAFE': path}``. Existing files are reused
+    only if ``MANIFEST`` shows they were written with the same ``rows``,
+    ``seed`` and ``chunk_rows``; otherwise both are written again.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {'DETE': os.path.join(directory, 'dete_survey.csv'),
+             'TAFE': os.path.join(directory, 'tafe_survey.csv')}
+    settings = {'rows': rows, 'seed': seed, 'chunk_rows': chunk_rows}
+    manifest = os.path.join(directory, MANIFEST)
+    try:
+        with open(manifest) as f:
+            reuse = json.load(f) == settings
+    except (FileNotFoundError, ValueError):
+        reuse = False
+    if reuse and all(os.path.exists(path) for path in paths.values()):
+        return paths
+    #the manifest goes first and last, so files from an interrupted run are never reused
+    if os.path.exists(manifest):
+        os.remove(manifest)
+    for (name, path), make in zip(paths.items(), (make_dete, make_tafe)):
+        write_survey(path + '.tmp', make, rows, seed, chunk_rows)
+        os.replace(path + '.tmp', path)
+    with open(manifest, 'w') as f:
+        json.dump(settings, f)
+    return paths
@@ -0,0 +1,6 @@
+"""Reusable pieces of the NYC schools analysis in DataCleaning_NYCSchools.ipynb."""
+
+from nyc_schools.corr import TargetCorrelation
+from nyc_schools.join import NOTEBOOK_JOINS, combine, dbn_keys, multi_join
+
+__all__ = ['NOTEBOOK_JOINS', 'TargetCorrelation', 'combine', 'dbn_keys', 'multi_join']
@@ -0,0 +1,97 @@
+"""Correlations of one target column with many others, with cached column statistics.
+
+``frame.corr()`` builds the whole k x k matrix to keep one of its columns.
+Here the target is centred and scaled to unit length once; the correlation
+of a complete column ``x`` with it is then ``x . z / |x - mean(x)|``, so
+one matrix-vector product answers any set of columns. Each column's norm
+is computed the first time the column is asked for and cached, so later
+subset queries (survey fields, race, gender, class size) only pay for the
+product. Columns with missing values, or any column when the target has
+them, use the rows where both values are present, as ``corr`` does.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _centred_norms(values):
+    """Length of each column of ``values`` about its mean."""
+    return np.sqrt(((values - values.mean(axis=0)) ** 2).sum(axis=0))
+
+
+def _pairwise(values, target):
+    """Pearson correlation of each column of ``values`` with ``target``, over the rows both have."""
+    present = ~np.isnan(values) & ~np.isnan(target)[:, None]
+    counts = present.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(present, values, 0.0)
+        y = np.where(present, target[:, None], 0.0)
+        x = np.where(present, x - x.sum(axis=0) / counts, 0.0)
+        y = np.where(present, y - y.sum(axis=0) / counts, 0.0)
+        result = (x * y).sum(axis=0) / np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+    return np.where(counts > 1, result, np.nan)
+
+
+class TargetCorrelation:
+    """Correlations of the numeric columns of ``frame`` with ``target``.
+
+    The cached statistics assume the columns do not change; call
+    ``forget`` after modifying one. New columns are picked up on demand.
+    """
+
+    def __init__(self, frame, target='sat_score'):
+        self.frame = frame
+        self.target = target
+        self._norms = {}
+        self._reset_target()
+
+    def _reset_target(self):
+        y = self._values([self.target])[:, 0]
+        self._target_complete = not np.isnan(y).any()
+        self._y = y
+        if self._target_complete:
+            centred = y - y.mean()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self._z = centred / np.sqrt(centred @ centred)
+
+    def _values(self, columns):
+        return self.frame[columns].to_numpy(dtype='float64', na_value=np.nan)
+
+    def numeric_columns(self):
+        return [c for c in self.frame.columns if pd.api.types.is_numeric_dtype(self.frame[c])]
+
+    def forget(self, *columns):
+        """Drop the cached statistics of ``columns`` (of every column if none are given)."""
+        if not columns:
+            self._norms.clear()
+        for c in columns:
+            self._norms.pop(c, None)
+        if not columns or self.target in columns:
+            self._reset_target()
+
+    def correlations(self, columns=None):
+        """Correlation of each of ``columns`` with the target, as a Series.
+
+        ``columns`` defaults to every numeric column, as ``frame.corr()``
+        would use; the target itself may be included and gives 1.0.
+        """
+        columns = self.numeric_columns() if columns is None else list(columns)
+        values = self._values(columns)
+        result = np.empty(len(columns))
+        missing = np.isnan(values).any(axis=0)
+        if not self._target_complete:
+            missing[:] = True
+        complete = np.flatnonzero(~missing)
+        if len(complete):
+            unseen = [i for i in complete if columns[i] not in self._norms]
+            if unseen:
+                self._norms.update(zip([columns[i] for i in unseen],
+                                       _centred_norms(values[:, unseen])))
+            norms = np.array([self._norms[columns[i]] for i in complete])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[complete] = values[:, complete].T @ self._z / norms
+            #a constant column, or fewer than two rows, has no correlation
+            result[complete] = np.where((norms > 0) & (len(values) > 1), result[complete], np.nan)
+        if missing.any():
+            result[missing] = _pairwise(values[:, missing], self._y)
+        return pd.Series(np.clip(result, -1.0, 1.0), index=pd.Index(columns), name=self.target)
@@ -0,0 +1,104 @@
+"""Multi-way DBN join for building the combined NYC schools frame.
+
+Chaining ``merge(..., on="DBN")`` re-hashes the growing frame at every
+step and copies every column it has gathered so far. Here each source is
+indexed on its key once, the joins only move arrays of row positions (one
+per source), and every column is gathered with a single ``take`` at the
+end. Left joins keep unmatched rows with missing values and inner joins
+drop them; sources with repeated keys fan out rows exactly as ``merge``
+does. Each join's cardinality is reported, so a source that drops or
+multiplies rows shows up immediately.
+"""
+
+import numpy as np
+import pandas as pd
+
+#(source, how) in the order the notebook merges them onto sat_results
+NOTEBOOK_JOINS = (
+    ('ap_2010', 'left'),
+    ('graduation', 'left'),
+    ('class_size', 'inner'),
+    ('demographics', 'inner'),
+    ('survey', 'inner'),
+    ('hs_directory', 'inner'),
+)
+
+REPORT_COLUMNS = ['how', 'source_rows', 'source_keys', 'duplicate_keys', 'rows_in', 'matched',
+                  'rows_out']
+
+
+def dbn_keys(csd, school_code):
+    """DBN keys from community school district numbers and school codes.
+
+    The district is zero-padded to two characters, as ``pad_csd`` did one
+    value at a time.
+    """
+    return csd.astype(str).str.zfill(2) + school_code.astype(str)
+
+
+def _positions(keys, source_keys, index, how):
+    """Rows of ``keys`` that survive the join and their row in the source (-1 if none)."""
+    if index.is_unique:
+        found = index.get_indexer(keys)
+        rows = np.arange(len(keys))
+        if how == 'inner':
+            rows = rows[found >= 0]
+            found = found[rows]
+        return rows, found
+    #repeated keys fan out; the join runs on two integer columns, not the frame
+    left = pd.DataFrame({'key': keys, 'row': np.arange(len(keys))})
+    right = pd.DataFrame({'key': source_keys, 'found': np.arange(len(source_keys))})
+    joined = left.merge(right, on='key', how=how, sort=False)
+    return joined['row'].to_numpy(), joined['found'].fillna(-1).to_numpy(dtype='int64')
+
+
+def _take(values, positions):
+    return values.array.take(positions, allow_fill=bool((positions < 0).any()))
+
+
+def multi_join(base, sources, key='DBN'):
+    """Join each ``(name, frame, how)`` of ``sources`` onto ``base`` by ``key``, in order.
+
+    ``how`` is 'left' or 'inner'. The result has the rows and columns of
+    the equivalent chain of ``merge`` calls, including the ``_x``/``_y``
+    suffixes on clashing column names. Returns ``(combined, report)``;
+    ``report`` has one row of cardinalities per source.
+    """
+    base_keys = base[key].to_numpy(dtype=object)
+    #row positions into base and each joined source, all the same length
+    base_rows = np.arange(len(base))
+    found = {}
+    report = {}
+    for name, frame, how in sources:
+        if how not in ('left', 'inner'):
+            raise ValueError('unsupported join for {0}: {1}'.format(name, how))
+        source_keys = frame[key].to_numpy(dtype=object)
+        index = pd.Index(source_keys)
+        keys = base_keys[base_rows]
+        rows, positions = _positions(keys, source_keys, index, how)
+        base_rows = base_rows[rows]
+        found = {n: p[rows] for n, p in found.items()}
+        found[name] = positions
+        matched = np.count_nonzero(np.bincount(rows[positions >= 0], minlength=len(keys)))
+        report[name] = [how, len(frame), index.nunique(), index[index.duplicated()].nunique(),
+                        len(keys), matched, len(base_rows)]
+    #gather every column once, renaming clashes the way merge does
+    names = list(base.columns)
+    columns = [_take(base[c], base_rows) for c in names]
+    for name, frame, how in sources:
+        for c in frame.columns:
+            if c == key:
+                continue
+            if c in names:
+                names[names.index(c)] = c + '_x'
+                names.append(c + '_y')
+            else:
+                names.append(c)
+            columns.append(_take(frame[c], found[name]))
+    combined = pd.DataFrame(dict(zip(names, columns)))
+    return combined, pd.DataFrame.from_dict(report, orient='index', columns=REPORT_COLUMNS)
+
+
+def combine(data, base='sat_results', joins=NOTEBOOK_JOINS, key='DBN'):
+    """Join the condensed sources in ``data`` ({name: frame}) as the notebook does."""
+    return multi_join(data[base], [(name, data[name], how) for name, how in joins], key)
@@ -0,0 +1,38 @@
+"""Shared fixtures: a small synthetic pair of surveys and their in-memory pivots."""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from exit_surveys.pipeline import finish, pivots  # noqa: E402
+from exit_surveys.sources import ingest  # noqa: E402
+from exit_surveys.synthetic import write_surveys  # noqa: E402
+
+ROWS = 3000
+
+
+def assert_pivots_equal(got, expected):
+    """``got`` has the pivots of ``expected``, value for value."""
+    assert list(got) == list(expected)
+    for name in expected:
+        pd.testing.assert_frame_equal(got[name], expected[name], check_exact=True,
+                                      check_index_type=False, check_names=False)
+
+
+@pytest.fixture(scope='session')
+def survey_paths(tmp_path_factory):
+    return write_surveys(str(tmp_path_factory.mktemp('surveys')), ROWS, seed=7, chunk_rows=1000)
+
+
+@pytest.fixture(scope='session')
+def combined(survey_paths):
+    return finish(ingest(survey_paths))
+
+
+@pytest.fixture(scope='session')
+def expected(combined):
+    return pivots(combined)
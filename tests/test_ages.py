@@ -0,0 +1,40 @@
+"""``normalize_age`` places both surveys' age strings in the same ordered bands."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exit_surveys.ages import age_bands, normalize_age
+
+RAW = ['21-25', '21  25', '20 or younger', '56 or older', '61 or older', '56-60', '41  45', None,
+       'junk', '26-30']
+
+
+def test_bands():
+    assert age_bands() == ['<21', '21-25', '26-30', '31-35', '36-40', '41-45', '46-50', '51-55',
+                           '>55']
+    with pytest.raises(ValueError):
+        age_bands(21, 50, 4)
+
+
+def test_both_surveys():
+    ages = pd.Series(RAW, index=range(10, 20), name='age')
+    got = normalize_age(ages)
+    assert got.index.equals(ages.index) and got.name == 'age'
+    assert got.cat.ordered and list(got.cat.categories) == age_bands()
+    assert got.tolist()[:7] == ['21-25', '21-25', '<21', '>55', '>55', '>55', '41-45']
+    #missing and unreadable ages are missing, not a band
+    assert got.isna().tolist() == [False] * 7 + [True, True, False]
+
+
+def test_higher_top():
+    #'56 or older' straddles 56-60 and >60, so it cannot be placed
+    got = normalize_age(pd.Series(RAW), top=60)
+    assert pd.isna(got[3])
+    assert got[4] == '>60' and got[5] == '56-60'
+
+
+def test_array_input():
+    got = normalize_age(np.array(['41  45', '41-45'], dtype=object))
+    assert isinstance(got, pd.Categorical)
+    assert list(got) == ['41-45', '41-45']
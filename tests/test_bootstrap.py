@@ -0,0 +1,43 @@
+"""Bootstrap intervals are reproducible and behave like binomial resampling."""
+
+import numpy as np
+import pytest
+
+from exit_surveys.bootstrap import bootstrap_pivots, bootstrap_replicates, confidence_intervals
+from exit_surveys.pipeline import group_counts
+
+
+def test_replicates_match_binomial_draws():
+    responses = np.array([40, 10, 200])
+    dissatisfied = np.array([10, 5, 30])
+    draws = bootstrap_replicates(responses, dissatisfied, replicates=6000, seed=3)
+    assert draws.shape == (3, 6000)
+    assert ((draws >= 0) & (draws <= 1)).all()
+    p = dissatisfied / responses
+    np.testing.assert_allclose(draws.mean(axis=1), p, atol=0.01)
+    np.testing.assert_allclose(draws.std(axis=1), np.sqrt(p * (1 - p) / responses), rtol=0.1)
+    #the blocks depend on the seed only, not on the processes drawing them
+    again = bootstrap_replicates(responses, dissatisfied, replicates=6000, seed=3, processes=2)
+    np.testing.assert_array_equal(again, draws)
+    assert not np.array_equal(bootstrap_replicates(responses, dissatisfied, 6000, seed=4), draws)
+
+
+def test_intervals(combined, expected):
+    tables = bootstrap_pivots(group_counts(combined), replicates=500, seed=1)
+    assert list(tables) == list(expected)
+    for name, table in tables.items():
+        assert table.index.astype(str).tolist() == expected[name].index.astype(str).tolist()
+        assert table['dissatisfied'].tolist() == pytest.approx(
+            expected[name]['dissatisfied'].tolist(), nan_ok=True)
+        present = table.dropna()
+        assert (present['low'] <= present['dissatisfied']).all()
+        assert (present['dissatisfied'] <= present['high']).all()
+
+
+def test_wider_at_higher_confidence(combined):
+    counts = group_counts(combined)
+    narrow = confidence_intervals(counts, 'institute', replicates=1000, confidence=0.5)
+    wide = confidence_intervals(counts, 'institute', replicates=1000, confidence=0.99)
+    assert ((wide['high'] - wide['low']) > (narrow['high'] - narrow['low'])).all()
+    with pytest.raises(KeyError):
+        confidence_intervals(counts, 'position')
@@ -0,0 +1,45 @@
+"""``cached_run`` gives the uncached frame, cold or warm, and re-cleans only what changed."""
+
+import shutil
+
+import pandas as pd
+
+from exit_surveys.cache import FrameCache, cached_run
+from exit_surveys.pipeline import pivots
+
+
+def test_warm_run_matches_cold(survey_paths, combined, expected, tmp_path):
+    cache = FrameCache(str(tmp_path / 'cache'))
+    cold = cached_run(survey_paths, cache=cache)
+    warm = cached_run(survey_paths, cache=cache)
+    for frame in (cold, warm):
+        assert list(frame.columns) == list(combined.columns)
+        assert (frame.dtypes.astype(str) == combined.dtypes.astype(str)).all()
+        for name, table in pivots(frame).items():
+            pd.testing.assert_frame_equal(table, expected[name])
+    #cached columns are private copy-on-write mappings: writable, files untouched
+    warm.loc[0, 'id'] = 5
+    assert cached_run(survey_paths, cache=cache).loc[0, 'id'] == combined.loc[0, 'id']
+
+
+def test_changed_file_recleans_only_its_source(survey_paths, tmp_path, monkeypatch):
+    paths = {}
+    for name, path in survey_paths.items():
+        paths[name] = str(tmp_path / '{0}.csv'.format(name))
+        shutil.copy(path, paths[name])
+    cache = FrameCache(str(tmp_path / 'cache'))
+    cached_run(paths, cache=cache)
+    with open(paths['TAFE'], 'a') as f:
+        f.write('\n')
+    cleaned = []
+
+    import exit_surveys.cache as module
+    real = module.clean_files
+
+    def spy(missing, *args):
+        cleaned.extend(missing)
+        return real(missing, *args)
+
+    monkeypatch.setattr(module, 'clean_files', spy)
+    cached_run(paths, cache=cache)
+    assert cleaned == ['TAFE']
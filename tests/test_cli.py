@@ -0,0 +1,67 @@
+"""``python -m exit_surveys`` writes the pivots and imports only what it needs."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from exit_surveys.cli import main, parse_sources
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def _sources(paths):
+    return ['--source', 'DETE=' + paths['DETE'], '--source', 'TAFE=' + paths['TAFE']]
+
+
+def test_parse_sources():
+    assert parse_sources(['dete=a.csv', 'TAFE=b=c.csv']) == {'DETE': 'a.csv', 'TAFE': 'b=c.csv'}
+    with pytest.raises(ValueError):
+        parse_sources(['dete_survey.csv'])
+
+
+def test_writes_pivots(survey_paths, expected, tmp_path, capsys):
+    out = str(tmp_path / 'out')
+    assert main(_sources(survey_paths) + ['--out', out]) == 0
+    printed = capsys.readouterr().out.split()
+    assert printed == [os.path.join(out, name + '.csv') for name in expected]
+    for name, table in expected.items():
+        got = pd.read_csv(os.path.join(out, name + '.csv'), index_col=0)
+        assert got.index.astype(str).tolist() == table.index.astype(str).tolist()
+        assert got['dissatisfied'].tolist() == pytest.approx(table['dissatisfied'].tolist())
+
+
+def test_json_and_log(survey_paths, expected, tmp_path, capsys):
+    out = str(tmp_path / 'out')
+    main(_sources(survey_paths) + ['--out', out, '--format', 'json', '--log', '-'])
+    stages = [json.loads(line)['stage'] for line in capsys.readouterr().out.splitlines()]
+    assert stages[-1] == 'pivot' and 'load' in stages
+    with open(os.path.join(out, 'age.json')) as f:
+        assert list(json.load(f)) == expected['age'].index.astype(str).tolist()
+
+
+@pytest.mark.parametrize('args', [
+    ['--source', 'dete_survey.csv'],
+    ['--source', 'DETE=no/such/file.csv'],
+    ['--database', 'x.db', '--compact'],
+])
+def test_bad_arguments(args):
+    with pytest.raises(SystemExit):
+        main(args)
+
+
+def test_unknown_source(survey_paths):
+    with pytest.raises(SystemExit):
+        main(['--source', 'QLD=' + survey_paths['DETE']])
+
+
+def test_lazy_imports():
+    #parsing the arguments must not pull in pandas or matplotlib
+    code = ('import sys; import exit_surveys.cli; '
+            'print(sorted(m for m in ("pandas", "matplotlib") if m in sys.modules))')
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    assert output.strip() == '[]'
@@ -0,0 +1,46 @@
+"""Compact dtypes hold the same values in less memory and give the same pivots."""
+
+import numpy as np
+import pandas as pd
+
+from conftest import assert_pivots_equal
+from exit_surveys.compact import compact_column, compact_frame, footprint_report, unify_categories
+from exit_surveys.pipeline import finish, pivots
+from exit_surveys.sources import ingest
+
+
+def test_compact_column():
+    assert compact_column(pd.Series(['a', 'b', 'a', None] * 10)).dtype == 'category'
+    unique = pd.Series(['x{0}'.format(i) for i in range(40)], dtype=object)
+    assert compact_column(unique).dtype == object
+    assert str(compact_column(pd.Series([True, None, False], dtype=object)).dtype) == 'boolean'
+    assert compact_column(pd.Series([2010.0, 2012.0])).dtype == 'int16'
+    years = compact_column(pd.Series([2010.0, np.nan]))
+    assert str(years.dtype) == 'Int16' and years.isna().tolist() == [False, True]
+    assert compact_column(pd.Series([1.5, 2.0])).dtype == 'float64'
+    assert compact_column(pd.Series([1, 300, -5], dtype='int64')).dtype == 'int16'
+    assert compact_column(pd.Series([1, 2 ** 40])).dtype == 'int64'
+
+
+def test_same_values_less_memory(combined):
+    small = compact_frame(combined)
+    assert small.index.equals(combined.index)
+    for name in combined.columns:
+        assert small[name].astype(object).where(small[name].notna(), None).tolist() == \
+            combined[name].astype(object).where(combined[name].notna(), None).tolist()
+    report = footprint_report(combined, small)
+    assert report.loc['total', 'after'] < report.loc['total', 'before']
+
+
+def test_compact_pipeline(survey_paths, expected):
+    combined = finish(ingest(survey_paths, compact=True))
+    assert (combined.dtypes == 'category').any()
+    assert_pivots_equal(pivots(combined), expected)
+
+
+def test_unify_categories():
+    a = pd.DataFrame({'c': pd.Series(['x', 'y'], dtype='category')})
+    b = pd.DataFrame({'c': pd.Series(['z'], dtype='category')})
+    together = pd.concat(unify_categories([a, b]), ignore_index=True)
+    assert together['c'].dtype == 'category'
+    assert together['c'].tolist() == ['x', 'y', 'z']
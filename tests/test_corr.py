@@ -0,0 +1,35 @@
+"""``nyc_schools.corr`` gives the ``sat_score`` column of ``frame.corr()``."""
+
+import numpy as np
+import pandas as pd
+
+from nyc_schools.corr import TargetCorrelation
+
+
+def make_frame(rows=500):
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame(rng.normal(size=(rows, 20)) * 50 + 300,
+                         columns=['c{0}'.format(i) for i in range(20)])
+    frame['sat_score'] = frame['c0'] * 2 + rng.normal(size=rows) * 40 + 1200
+    frame['constant'] = 1.0
+    frame['name'] = 'school'
+    frame.loc[rng.random(rows) < 0.1, 'c5'] = np.nan
+    return frame
+
+
+def test_all_columns():
+    frame = make_frame()
+    got = TargetCorrelation(frame).correlations()
+    pd.testing.assert_series_equal(got, frame.corr(numeric_only=True)['sat_score'], atol=1e-12)
+
+
+def test_subsets_and_missing_target():
+    frame = make_frame()
+    correlations = TargetCorrelation(frame)
+    subset = ['c3', 'c1', 'sat_score', 'c5']
+    pd.testing.assert_series_equal(correlations.correlations(subset),
+                                   frame[subset].corr()['sat_score'], atol=1e-12)
+    frame.loc[0, 'sat_score'] = np.nan
+    correlations.forget('sat_score')
+    pd.testing.assert_series_equal(correlations.correlations(subset),
+                                   frame[subset].corr()['sat_score'], atol=1e-12)
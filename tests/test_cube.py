@@ -0,0 +1,33 @@
+"""``Cube`` marginals give the pivots and groupbys over the rows."""
+
+import numpy as np
+import pytest
+
+from conftest import assert_pivots_equal
+from exit_surveys.cube import Cube
+from exit_surveys.pipeline import complete_rows
+
+
+def test_pivots(survey_paths, combined, expected, tmp_path):
+    assert_pivots_equal(Cube.from_surveys(survey_paths, chunksize=900).pivots(), expected)
+    cube = Cube.from_frame(combined)
+    cube.save(str(tmp_path / 'cube.npz'))
+    assert_pivots_equal(Cube.load(str(tmp_path / 'cube.npz')).pivots(), expected)
+
+
+def test_custom_dims(combined, tmp_path):
+    cube = Cube.from_frame(combined, dims=('gender', 'institute', 'complete'))
+    rows = combined[complete_rows(combined).to_numpy()].dropna(subset=['dissatisfied'])
+    expected = rows.groupby(['institute', 'gender'])['dissatisfied']
+    got = cube.proportions(['institute', 'gender']).reindex(expected.size().index)
+    assert got['responses'].tolist() == expected.size().tolist()
+    np.testing.assert_allclose(got['dissatisfied'].to_numpy(), expected.mean().to_numpy(dtype=float))
+    everyone = cube.proportions('gender', complete=False)
+    assert everyone['responses'].sum() == combined.dropna(subset=['gender'])['dissatisfied'].count()
+    cube.save(str(tmp_path / 'cube.npz'))
+    assert Cube.load(str(tmp_path / 'cube.npz')).proportions('gender').equals(cube.proportions('gender'))
+
+
+def test_dims_need_complete():
+    with pytest.raises(ValueError):
+        Cube(dims=('institute', 'gender'))
@@ -0,0 +1,48 @@
+"""``parse_year`` and ``parse_service`` read every format the surveys use."""
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.dates import parse_service, parse_year
+
+
+def test_parse_year_strings():
+    values = pd.Series(['2012', '05/2013', '5/2014', ' 2010 ', '13/2012', '00/2012', 'Not Stated',
+                        None, '2012/05'], index=range(5, 14), name='cease_date')
+    years, unparseable = parse_year(values)
+    assert str(years.dtype) == 'Int16'
+    assert years.index.equals(values.index) and years.name == 'cease_date'
+    assert years[:4].tolist() == [2012, 2013, 2014, 2010]
+    #invalid months, tokens and other layouts are NA and counted; missing values are not counted
+    assert years.isna().tolist() == [False] * 4 + [True] * 5
+    assert unparseable == 4
+
+
+def test_parse_year_numbers():
+    years, unparseable = parse_year(pd.Series([2010.0, 2013.0, np.nan, 2011.5, 12.0]))
+    assert years[:2].tolist() == [2010, 2013]
+    assert years[2:].isna().all()
+    assert unparseable == 2
+
+
+def test_parse_service_strings():
+    values = pd.Series(['1-2', '11 - 20', 'Less than 1 year', 'More than 20 years',
+                        'less than  5 years', '3.5', 'Not Stated', None])
+    bounds, unparseable = parse_service(values)
+    assert list(bounds.columns) == ['service_low', 'service_high']
+    assert (bounds.dtypes.astype(str) == 'Int16').all()
+    low = bounds['service_low'].astype(object).where(bounds['service_low'].notna(), None)
+    high = bounds['service_high'].astype(object).where(bounds['service_high'].notna(), None)
+    assert low.tolist() == [1, 11, 0, 20, 0, 3, None, None]
+    assert high.tolist() == [2, 20, 0, None, 4, 3, None, None]
+    assert unparseable == 1
+
+
+def test_parse_service_numbers():
+    values = pd.Series([0.0, 2.9, 25.0, np.nan], index=[10, 20, 30, 40])
+    bounds, unparseable = parse_service(values)
+    assert bounds.index.equals(values.index)
+    assert bounds['service_low'][:3].tolist() == [0, 2, 25]
+    assert bounds['service_high'][:3].tolist() == [0, 2, 25]
+    assert bounds.iloc[3].isna().all()
+    assert unparseable == 0
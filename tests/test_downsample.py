@@ -0,0 +1,59 @@
+"""``lttb`` and ``minmax`` keep the shape and the extremes of a long series."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from euro_us.downsample import downsample_series, lttb, minmax, plot_downsampled
+
+
+def make_series(days=20000):
+    rng = np.random.default_rng(5)
+    times = pd.date_range('1999-01-04', periods=days, freq='D').to_numpy()
+    return times, 1.1 + np.cumsum(rng.normal(0, 0.005, days))
+
+
+@pytest.mark.parametrize('method', [lttb, minmax])
+def test_positions(method):
+    times, rates = make_series()
+    kept = method(times, rates, 800)
+    assert kept[0] == 0 and kept[-1] == len(rates) - 1
+    assert (np.diff(kept) > 0).all()
+    assert len(kept) <= 802
+    #short series are returned whole
+    np.testing.assert_array_equal(method(times[:50], rates[:50], 800), np.arange(50))
+
+
+def test_minmax_keeps_extremes():
+    times, rates = make_series()
+    kept = minmax(times, rates, 300)
+    assert rates.argmin() in kept and rates.argmax() in kept
+
+
+def test_lttb_keeps_a_spike():
+    times, rates = make_series()
+    rates[12345] += 1.0
+    assert 12345 in lttb(times, rates, 500)
+    assert len(lttb(times, rates, 500)) == 500
+
+
+def test_downsample_series_drops_nan():
+    times, rates = make_series(5000)
+    rolled = pd.Series(rates).rolling(30).mean().to_numpy()
+    x, y, report = downsample_series(times, rolled, 400, method='minmax')
+    assert not np.isnan(y).any()
+    assert x.dtype == times.dtype
+    assert report.points_in == 5000 and report.points_out == len(y)
+    assert report.ratio == pytest.approx(5000 / len(y))
+    with pytest.raises(ValueError):
+        downsample_series(times, rates, 400, method='every')
+
+
+def test_plot_downsampled():
+    from matplotlib.figure import Figure
+
+    times, rates = make_series()
+    ax = Figure(figsize=(4, 2), dpi=100).add_subplot()
+    lines, report = plot_downsampled(ax, times, rates)
+    assert report.points_out <= ax.get_window_extent().width + 1
+    assert len(lines[0].get_xdata()) == report.points_out
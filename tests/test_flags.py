@@ -0,0 +1,59 @@
+"""``flag_values`` and ``dissatisfied`` give the notebook's ``update_vals`` and ``any``."""
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.flags import DETE_FLAGS, TAFE_FLAGS, FlagSpec, dissatisfied, flag_values
+
+
+def update_vals(myval):
+    if (pd.isnull(myval)):
+        return np.nan
+    elif (myval == '-'):
+        return False
+    else:
+        return True
+
+
+def make_tafe(rows=400):
+    rng = np.random.default_rng(3)
+    columns = TAFE_FLAGS.columns
+    choices = np.array(['-', 'Dissatisfaction', None], dtype=object)
+    return pd.DataFrame({c: choices[rng.integers(0, 3, rows)] for c in columns},
+                        index=np.arange(rows) * 2)
+
+
+def test_flag_values_match_update_vals():
+    frame = make_tafe()
+    got = flag_values(frame, TAFE_FLAGS)
+    assert list(got.columns) == list(TAFE_FLAGS.columns)
+    assert got.index.equals(frame.index)
+    expected = frame[list(TAFE_FLAGS.columns)].apply(lambda col: col.map(update_vals))
+    for col in TAFE_FLAGS.columns:
+        assert (got[col].isna() == expected[col].isna()).all()
+        present = expected[col].notna()
+        assert (got[col][present].astype(bool) == expected[col][present].astype(bool)).all()
+
+
+def test_dissatisfied_is_any_positive():
+    frame = make_tafe()
+    got = dissatisfied(frame, TAFE_FLAGS)
+    flags = frame[list(TAFE_FLAGS.columns)].apply(lambda col: col.map(update_vals))
+    positive = (flags == True).any(axis=1)  # noqa: E712
+    unknown = ~positive & flags.isna().any(axis=1)
+    assert (got[positive] == True).all()  # noqa: E712
+    assert got[unknown].isna().all()
+    assert (got[~positive & ~unknown] == False).all()  # noqa: E712
+
+
+def test_dete_booleans():
+    frame = pd.DataFrame({c: [False] * 3 for c in DETE_FLAGS.columns})
+    frame['workload'] = [False, True, False]
+    frame['work_location'] = pd.array([False, False, None], dtype='boolean')
+    assert dissatisfied(frame, DETE_FLAGS).tolist() == [False, True, pd.NA]
+
+
+def test_custom_negative_tokens():
+    spec = FlagSpec(columns=('a', 'b'), negative=('no', 'n/a'))
+    frame = pd.DataFrame({'a': ['no', 'yes', 'n/a'], 'b': ['n/a', 'no', 'no']})
+    assert dissatisfied(frame, spec).tolist() == [False, True, False]
@@ -0,0 +1,57 @@
+"""``nyc_schools.join`` gives the notebook's chain of merges."""
+
+import numpy as np
+import pandas as pd
+
+from nyc_schools.join import NOTEBOOK_JOINS, combine, dbn_keys
+
+
+def pad_csd(num):
+    string_representation = str(num)
+    if len(string_representation) > 1:
+        return string_representation
+    else:
+        return "0" + string_representation
+
+
+def make_source(rng, rows, name, unique=True, extra=()):
+    keys = ['{0:02d}M{1:03d}'.format(*divmod(int(i), 1000)) for i in rng.integers(0, 5000, rows)]
+    frame = pd.DataFrame({'DBN': keys})
+    if unique:
+        frame = frame.drop_duplicates('DBN')
+    for column in (name,) + tuple(extra):
+        frame[column] = rng.normal(size=len(frame))
+    frame[name + '_count'] = np.arange(len(frame))
+    frame[name + '_text'] = ['{0}{1}'.format(name, i) for i in range(len(frame))]
+    return frame.reset_index(drop=True)
+
+
+def test_dbn_keys():
+    csd = pd.Series([1, 2, 10, 31])
+    code = pd.Series(['M015', 'K100', 'X003', 'Q400'])
+    expected = [pad_csd(n) + c for n, c in zip(csd, code)]
+    assert dbn_keys(csd, code).tolist() == expected
+
+
+def test_combine_matches_chained_merges():
+    rng = np.random.default_rng(3)
+    data = {
+        'sat_results': make_source(rng, 3000, 'sat'),
+        #repeated keys fan out, and 'shared' clashes with class_size
+        'ap_2010': make_source(rng, 800, 'ap', unique=False, extra=('shared',)),
+        'graduation': make_source(rng, 900, 'grad'),
+        'class_size': make_source(rng, 4000, 'cls', extra=('shared',)),
+        'demographics': make_source(rng, 4000, 'dem'),
+        'survey': make_source(rng, 4200, 'sur'),
+        'hs_directory': make_source(rng, 4500, 'hs'),
+    }
+    data['sat_results'].loc[5, 'DBN'] = None
+    data['ap_2010'].loc[3, 'DBN'] = None
+    combined, report = combine(data)
+    expected = data['sat_results']
+    for name, how in NOTEBOOK_JOINS:
+        expected = expected.merge(data[name], on='DBN', how=how)
+    pd.testing.assert_frame_equal(combined, expected)
+    assert report['rows_out'].iloc[-1] == len(expected)
+    assert report.loc['ap_2010', 'duplicate_keys'] > 0
+    assert (report['rows_out'].iloc[:-1].to_numpy() == report['rows_in'].iloc[1:].to_numpy()).all()
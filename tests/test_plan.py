@@ -0,0 +1,60 @@
+"""Optimized plans give what the same plan gives unoptimized."""
+
+import pandas as pd
+import pytest
+
+from conftest import assert_pivots_equal
+from exit_surveys.dates import parse_year
+from exit_surveys.plan import Plan, optimize, plan_pivots
+from exit_surveys.sources import SOURCES
+
+
+@pytest.mark.parametrize('chunksize', [None, 700])
+def test_plan_pivots(survey_paths, expected, chunksize):
+    assert_pivots_equal(plan_pivots(survey_paths, chunksize), expected)
+
+
+def assert_same_rows(plan, chunksize=None):
+    naive = plan.execute(chunksize)
+    pd.testing.assert_frame_equal(optimize(plan).execute(chunksize), naive)
+    return naive
+
+
+def test_derive_does_not_overtake_a_reader(survey_paths):
+    plan = (Plan.scan(SOURCES['DETE'], survey_paths['DETE'])
+            .derive('raw_cease', lambda f: f['cease_date'], ['cease_date'])
+            .derive('cease_date', lambda f: parse_year(f['cease_date'])[0], ['cease_date'])
+            .filter('cease_date', 2012)
+            .select('raw_cease'))
+    rows = assert_same_rows(plan, 500)
+    assert len(rows) and rows['raw_cease'].str.endswith('2012').all()
+    assert not rows['raw_cease'].str.fullmatch('2012').all()
+
+
+def test_derive_does_not_overtake_an_overwrite(survey_paths):
+    plan = (Plan.scan(SOURCES['DETE'], survey_paths['DETE'])
+            .derive('year', lambda f: parse_year(f['cease_date'])[0], ['cease_date'])
+            .derive('label', lambda f: f['year'].astype('str'), ['year'])
+            .derive('first', lambda f: f['label'], ['label'])
+            .derive('label', lambda f: f['region'], ['region'])
+            .filter('label', 'Metropolitan')
+            .select('first', 'label'))
+    rows = assert_same_rows(plan)
+    assert len(rows) and (rows['label'] == 'Metropolitan').all()
+
+
+def test_select_before_filter(survey_paths):
+    plan = (Plan.scan(SOURCES['DETE'], survey_paths['DETE'])
+            .derive('cease', lambda f: f['cease_date'], ['cease_date'])
+            .select('cease', 'cease_date')
+            .derive('cease_date', lambda f: parse_year(f['cease_date'])[0], ['cease_date'])
+            .filter('cease_date', 2013))
+    assert_same_rows(plan)
+
+
+def test_no_steps_after_group(survey_paths):
+    plan = Plan.scan(SOURCES['DETE'], survey_paths['DETE']).group(['region'], rows=('id', 'size'))
+    with pytest.raises(ValueError):
+        plan.filter('region', 'Metropolitan')
+    with pytest.raises(ValueError):
+        optimize(plan).select('region')
@@ -0,0 +1,60 @@
+"""``RecordStore`` upserts and deletes keep its rows and counts in step."""
+
+import pytest
+
+from conftest import assert_pivots_equal
+from exit_surveys.pipeline import pivots
+from exit_surveys.records import RecordStore
+
+
+def _keys(rows):
+    return list(zip(rows['institute'], rows['id']))
+
+
+@pytest.fixture
+def halves(combined):
+    middle = len(combined) // 2
+    return combined.iloc[:middle], combined.iloc[middle:]
+
+
+def test_upsert_surveys(survey_paths, combined, expected):
+    store = RecordStore()
+    assert store.upsert_surveys(survey_paths) == {'inserted': len(combined), 'updated': 0}
+    assert_pivots_equal(store.pivots(), expected)
+    row = combined.iloc[5]
+    assert store.get(row['institute'], record_id=row['id']).equals(row)
+
+
+def test_delete_all(halves):
+    store = RecordStore()
+    for rows in halves:
+        store.upsert(rows)
+    assert store.delete(_keys(halves[0]) + _keys(halves[1])) == sum(len(h) for h in halves)
+    assert len(store) == 0
+    assert len(store.frame()) == 0
+    assert store.aggregates.counts()[['dissatisfied', 'responses', 'rows']].eq(0).all().all()
+    #the emptied store takes new rows again
+    store.upsert(halves[0])
+    assert len(store) == len(halves[0])
+
+
+def test_upsert_then_delete(combined, halves):
+    store = RecordStore()
+    store.upsert(combined)
+    assert store.upsert(halves[1]) == {'inserted': 0, 'updated': len(halves[1])}
+    assert store.delete(_keys(halves[1])) == len(halves[1])
+    assert len(store) == len(halves[0])
+    assert store.frame().equals(halves[0].reset_index(drop=True))
+    for name, table in pivots(halves[0]).items():
+        assert store.pivots()[name].equals(table)
+
+
+def test_single_batch_compacts(combined):
+    store = RecordStore()
+    store.upsert(combined)
+    store.delete(_keys(combined.iloc[:len(combined) * 3 // 4]))
+    #more than half the rows of the one batch were dead, so it was rewritten
+    assert sum(len(b) for b in store._batches) == len(store)
+    assert store.frame().equals(combined.iloc[len(combined) * 3 // 4:].reset_index(drop=True))
+    last = combined.iloc[-1]
+    assert store.get(last['institute'], last['id'])['id'] == last['id']
@@ -0,0 +1,38 @@
+"""``render_figures`` draws every chart once and then only the ones that changed."""
+
+import os
+
+import pytest
+
+from exit_surveys.render import FigureSpec, pivot_specs, read_manifest, render_figures
+
+
+@pytest.fixture
+def specs(expected):
+    return pivot_specs(expected)
+
+
+def test_skips_unchanged(specs, expected, tmp_path):
+    directory = str(tmp_path)
+    paths = [os.path.join(directory, name + '.png') for name in expected]
+    first = render_figures(specs, directory)
+    assert first == {'written': paths, 'skipped': []}
+    assert set(read_manifest(directory)) == {name + '.png' for name in expected}
+    assert render_figures(pivot_specs(expected), directory) == {'written': [], 'skipped': paths}
+    #a changed table, a changed title and a deleted file are each drawn again
+    changed = dict(expected, age=expected['age'].assign(dissatisfied=0.5))
+    again = pivot_specs(changed)
+    again[2] = FigureSpec('institute', expected['institute'], 'Another title')
+    os.remove(paths[0])
+    assert render_figures(again, directory)['written'] == paths
+    assert render_figures(again, directory, force=True)['written'] == paths
+
+
+def test_processes(specs, tmp_path):
+    written = render_figures(specs, str(tmp_path), processes=2)['written']
+    assert all(os.path.getsize(path) for path in written)
+
+
+def test_specs_compare_by_identity(specs):
+    assert specs[0] == specs[0] and specs[0] != pivot_specs({'service': specs[0].table})[0]
+    assert len({spec: spec.filename for spec in specs}) == len(specs)
@@ -0,0 +1,48 @@
+"""``euro_us.rolling`` gives ``Series.rolling`` and the notebook's date masks."""
+
+import numpy as np
+import pandas as pd
+
+from euro_us.rolling import RateSeries
+
+
+def make_rates(days=3000):
+    rng = np.random.default_rng(0)
+    rates = 1.1 + np.cumsum(rng.normal(0, 0.005, days))
+    rates[100] = np.nan
+    return pd.DataFrame({'Time': pd.bdate_range('1999-01-04', periods=days), 'US_dollar': rates})
+
+
+def assert_rolling(frame, rates):
+    rolling = rates['US_dollar'].rolling(30)
+    for name, expected in [('rolling_mean', rolling.mean()), ('rolling_min', rolling.min()),
+                           ('rolling_max', rolling.max())]:
+        np.testing.assert_allclose(frame[name].to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12)
+
+
+def test_extend_and_append_match_rolling():
+    rates = make_rates()
+    series = RateSeries.from_frame(rates.iloc[:1000])
+    for time, rate in zip(rates['Time'].iloc[1000:2000], rates['US_dollar'].iloc[1000:2000]):
+        series.append(time, rate)
+    series.extend(rates['Time'].iloc[2000:], rates['US_dollar'].iloc[2000:])
+    assert_rolling(series.frame(), rates)
+
+
+def test_between_matches_masks():
+    rates = make_rates()
+    series = RateSeries.from_frame(rates)
+    got = series.between('2003-01-01', '2005-06-01')
+    expected = rates[(rates['Time'] > '2002-12-31') & (rates['Time'] < '2005-06-01')]
+    assert got.index.equals(expected.index)
+    assert (got['Time'].to_numpy() == expected['Time'].to_numpy()).all()
+    assert len(series.between('2030-01-01')) == 0
+
+
+def test_save_load_then_append(tmp_path):
+    rates = make_rates()
+    series = RateSeries.from_frame(rates.iloc[:-1])
+    series.save(str(tmp_path / 'rates.npz'))
+    loaded = RateSeries.load(str(tmp_path / 'rates.npz'))
+    loaded.append(rates['Time'].iloc[-1], rates['US_dollar'].iloc[-1])
+    assert_rolling(loaded.frame(), rates)
@@ -0,0 +1,36 @@
+"""``SurveyDatabase`` gives ``pipeline.pivots`` from SQL aggregates."""
+
+import numpy as np
+import pytest
+
+from conftest import assert_pivots_equal
+from exit_surveys.sqlstore import SurveyDatabase
+
+
+def test_load_surveys(survey_paths, combined, expected, tmp_path):
+    with SurveyDatabase(str(tmp_path / 'surveys.db')) as db:
+        assert db.load_surveys(survey_paths, chunksize=1000, batch_rows=700) == len(combined)
+        assert len(db) == len(combined)
+        assert_pivots_equal(db.pivots(), expected)
+
+
+def test_waves_and_reopen(combined, expected, tmp_path):
+    path = str(tmp_path / 'surveys.db')
+    middle = len(combined) // 2
+    with SurveyDatabase(path) as db:
+        db.load_frame(combined.iloc[:middle])
+    with SurveyDatabase(path) as db:
+        db.load_frame(combined.iloc[middle:], batch_rows=500)
+        assert_pivots_equal(db.pivots(), expected)
+
+
+def test_proportions(combined, tmp_path):
+    with SurveyDatabase(str(tmp_path / 'surveys.db')) as db:
+        db.load_frame(combined)
+        rows = combined.dropna(subset=['gender', 'dissatisfied'])
+        grouped = rows.groupby(['institute', 'gender'])['dissatisfied']
+        got = db.proportions(['institute', 'gender'], complete=False).reindex(grouped.size().index)
+        assert got['responses'].tolist() == grouped.size().tolist()
+        np.testing.assert_allclose(got['dissatisfied'], grouped.mean().to_numpy(dtype=float))
+        with pytest.raises(KeyError):
+            db.proportions('dissatisfied; DROP TABLE responses')
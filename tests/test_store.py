@@ -0,0 +1,43 @@
+"""``AggregateStore`` gives ``pipeline.pivots`` from counts added wave by wave."""
+
+import pandas as pd
+import pytest
+
+from conftest import assert_pivots_equal
+from exit_surveys.pipeline import group_counts, pivots
+from exit_surveys.store import AggregateStore
+
+
+def test_add_surveys(survey_paths, expected, tmp_path):
+    store = AggregateStore()
+    store.add_surveys(survey_paths, chunksize=800)
+    assert_pivots_equal(store.pivots(), expected)
+    store.save(str(tmp_path / 'counts.csv'))
+    assert_pivots_equal(AggregateStore(str(tmp_path / 'counts.csv')).pivots(), expected)
+
+
+def test_waves(combined, expected, tmp_path):
+    middle = len(combined) // 2
+    path = str(tmp_path / 'counts.csv')
+    AggregateStore(path).add_frame(combined.iloc[:middle]).save()
+    store = AggregateStore(path).add_frame(combined.iloc[middle:])
+    assert_pivots_equal(store.pivots(), expected)
+    #negative counts take a wave back out
+    counts = group_counts(combined.iloc[middle:])
+    counts[['dissatisfied', 'responses', 'rows']] *= -1
+    store.add(counts)
+    assert_pivots_equal(store.pivots(), pivots(combined.iloc[:middle]))
+
+
+def test_proportions(combined):
+    store = AggregateStore().add_frame(combined)
+    got = store.proportions('institute', complete=False)
+    rows = combined.dropna(subset=['dissatisfied'])
+    assert got['responses'].tolist() == rows.groupby('institute').size().tolist()
+    pd.testing.assert_series_equal(got['dissatisfied'],
+                                   rows.groupby('institute')['dissatisfied'].mean().astype('float64'),
+                                   check_names=False)
+    with pytest.raises(KeyError):
+        store.proportions('position')
+    with pytest.raises(ValueError):
+        store.save()
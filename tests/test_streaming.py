@@ -0,0 +1,11 @@
+"""``stream_pivots`` gives the in-memory ``pipeline.pivots`` whatever the chunk size."""
+
+import pytest
+
+from conftest import assert_pivots_equal
+from exit_surveys.streaming import stream_pivots
+
+
+@pytest.mark.parametrize('chunksize', [250, 1000, 100000])
+def test_stream_pivots(survey_paths, expected, chunksize):
+    assert_pivots_equal(stream_pivots(survey_paths, chunksize), expected)
@@ -0,0 +1,45 @@
+"""``map_unique`` and ``extract_unique`` clean each distinct value once and keep missing values missing."""
+
+import numpy as np
+import pandas as pd
+
+from exit_surveys.strings import clear_memo, extract_unique, map_unique
+
+
+def test_map_unique_once_per_value():
+    calls = []
+
+    def clean(raw):
+        calls.append(raw)
+        return raw.upper()
+
+    clear_memo()
+    values = pd.Series(['a', 'b', None, 'a', np.nan, 'b'], index=list('uvwxyz'), name='col')
+    got = map_unique(values, clean, missing='?')
+    assert got.tolist() == ['A', 'B', '?', 'A', '?', 'B']
+    assert got.index.equals(values.index) and got.name == 'col'
+    assert calls == ['a', 'b']
+    #later calls only clean values they have not seen
+    map_unique(pd.Series(['b', 'c']), clean)
+    assert calls == ['a', 'b', 'c']
+
+
+def test_map_unique_dtype():
+    got = map_unique(pd.Series(['1', None, '22']), len, 'int8', missing=-1)
+    assert got.dtype == 'int8' and got.tolist() == [1, -1, 2]
+
+
+def test_extract_unique_missing():
+    values = pd.Series(['Resignation-Other reasons', 'Age Retirement', None, np.nan,
+                        'Resignation-Move overseas/interstate', '-'])
+    got = extract_unique(values, r'^([^-]+)')
+    assert got[[0, 1, 4]].tolist() == ['Resignation', 'Age Retirement', 'Resignation']
+    #missing values and a value without a match are missing, not 'None' or 'nan'
+    assert got.isna().tolist() == [False, False, True, True, False, True]
+    assert not got.isin(['None', 'nan']).any()
+    assert (got == 'Resignation').sum() == 2
+
+
+def test_extract_unique_numbers():
+    got = extract_unique(pd.Series([2012.0, 2013.0, None]), r'^(\d{4})')
+    assert got[:2].tolist() == ['2012', '2013'] and pd.isna(got[2])
@@ -0,0 +1,36 @@
+"""``write_surveys`` writes what it is asked for and reuses only matching files."""
+
+import json
+import os
+
+import pandas as pd
+
+from exit_surveys.synthetic import MANIFEST, write_surveys
+
+
+def _rows(paths):
+    return {name: len(pd.read_csv(path)) for name, path in paths.items()}
+
+
+def test_reuse_only_same_settings(tmp_path):
+    directory = str(tmp_path)
+    paths = write_surveys(directory, 300, chunk_rows=100)
+    assert _rows(paths) == {'DETE': 300, 'TAFE': 300}
+    written = os.path.getmtime(paths['DETE'])
+    assert write_surveys(directory, 300, chunk_rows=100) == paths
+    assert os.path.getmtime(paths['DETE']) == written
+    #a different size in the same directory is written again, not reused
+    write_surveys(directory, 500, chunk_rows=100)
+    assert _rows(paths) == {'DETE': 500, 'TAFE': 500}
+    with open(os.path.join(directory, MANIFEST)) as f:
+        assert json.load(f) == {'rows': 500, 'seed': 0, 'chunk_rows': 100}
+
+
+def test_seeds(tmp_path):
+    first = write_surveys(str(tmp_path / 'a'), 400, seed=1, chunk_rows=100)
+    again = write_surveys(str(tmp_path / 'b'), 400, seed=1, chunk_rows=100)
+    other = write_surveys(str(tmp_path / 'c'), 400, seed=2, chunk_rows=100)
+    ages = [pd.read_csv(paths['DETE'])['Age'] for paths in (first, again, other)]
+    assert ages[0].equals(ages[1])
+    #seed 2's first chunk is not seed 1's second chunk
+    assert not ages[0].iloc[100:200].reset_index(drop=True).equals(ages[2].iloc[:100])